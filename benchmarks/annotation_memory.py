@@ -0,0 +1,70 @@
+"""
+Benchmark memory use of annotations as lists of tuples compared to
+:class:`monoseq.Regions` objects, and of partitionings with sets compared to
+bitmasks.
+
+Run with ``python benchmarks/annotation_memory.py`` from the repository root.
+This uses the :mod:`tracemalloc` module and therefore requires Python 3.4 or
+higher.
+
+.. Licensed under the MIT license, see the LICENSE.rst file.
+"""
+
+
+from __future__ import print_function
+
+import random
+import tracemalloc
+
+from monoseq import partition_range, Regions
+
+
+def allocated(function, *args, **kwargs):
+    """
+    Call `function` and return a tuple of its result and the memory in
+    megabytes allocated for it.
+    """
+    tracemalloc.start()
+    result = function(*args, **kwargs)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size / 1024.0 ** 2
+
+
+def random_pairs(stop, regions, levels=3, max_length=500, seed=None):
+    """
+    Generate `levels` annotation levels with a total of `regions` random
+    regions in the range from 0 to `stop`.
+    """
+    rng = random.Random(seed)
+    annotations = [[] for _ in range(levels)]
+    for i in range(regions):
+        start = rng.randrange(stop)
+        annotations[i % levels].append(
+            (start, min(start + rng.randint(1, max_length), stop)))
+    return annotations
+
+
+def main():
+    """
+    Print a table with memory use for 10^4 to 10^6 regions.
+    """
+    print('{:>10} {:>12} {:>12} {:>12} {:>12}'.format(
+        'regions', 'pairs (MB)', 'arrays (MB)', 'sets (MB)', 'masks (MB)'))
+    for exponent in range(4, 7):
+        regions = 10 ** exponent
+        stop = regions * 100
+
+        pairs, pairs_size = allocated(random_pairs, stop, regions,
+                                      seed=exponent)
+        _, arrays_size = allocated(lambda: [Regions.from_pairs(level)
+                                            for level in pairs])
+        _, sets_size = allocated(partition_range, stop, pairs)
+        _, masks_size = allocated(partition_range, stop, pairs, bitmask=True)
+
+        print('{:>10} {:12.1f} {:12.1f} {:12.1f} {:12.1f}'.format(
+            regions, pairs_size, arrays_size, sets_size, masks_size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark peak memory use of the ``monoseq`` command line interface on FASTA
+files with a single record of increasing length.
+
+Run with ``python benchmarks/fasta_memory.py`` from the repository root. This
+uses the :mod:`resource` module and therefore only works on Unix.
+
+.. Licensed under the MIT license, see the LICENSE.rst file.
+"""
+
+
+from __future__ import print_function
+
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+
+def write_fasta(path, length, line_length=60, seed=None):
+    """
+    Write a FASTA file with one random DNA record of `length` bases.
+    """
+    rng = random.Random(seed)
+    line = ''.join(rng.choice('ACGT') for _ in range(line_length)) + '\n'
+    with open(path, 'w') as fasta:
+        fasta.write('>chr1\n')
+        for _ in range(length // line_length):
+            fasta.write(line)
+        fasta.write(line[:length % line_length] + '\n')
+
+
+#: Script measuring peak memory use of ``monoseq`` in a fresh process, so
+#: measurements are not affected by earlier runs. If the first argument is
+#: ``-``, the FASTA file is piped through standard input.
+_MEASURE = """
+import os, resource, subprocess, sys
+command = [sys.executable, '-m', 'monoseq.commands']
+devnull = open(os.devnull, 'w')
+if sys.argv[1] == '-':
+    cat = subprocess.Popen(['cat', sys.argv[2]], stdout=subprocess.PIPE)
+    subprocess.check_call(command, stdin=cat.stdout, stdout=devnull)
+    cat.wait()
+else:
+    subprocess.check_call(command + [sys.argv[1]], stdout=devnull)
+print(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+"""
+
+
+def peak_rss(path, stdin=False):
+    """
+    Run ``monoseq`` on the FASTA file `path` and return its peak resident set
+    size in megabytes.
+    """
+    args = ['-', path] if stdin else [path]
+    output = subprocess.check_output([sys.executable, '-c', _MEASURE] + args)
+    # Linux reports kilobytes, OS X reports bytes.
+    return int(output) / (1024.0 ** 2 if sys.platform == 'darwin' else 1024.0)
+
+
+def main():
+    """
+    Print a table with peak memory use for records of 1 Mb to 100 Mb.
+    """
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'benchmark.fa')
+
+    print('{:>10} {:>14} {:>14}'.format('length', 'file (MB)', 'stdin (MB)'))
+    try:
+        for exponent in range(6, 9):
+            length = 10 ** exponent
+            write_fasta(path, length, seed=exponent)
+            from_file = peak_rss(path)
+            from_stdin = peak_rss(path, stdin=True)
+            print('{:>10} {:14.1f} {:14.1f}'.format(length, from_file,
+                                                    from_stdin))
+    finally:
+        os.remove(path)
+        os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    main()
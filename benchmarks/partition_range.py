@@ -0,0 +1,100 @@
+"""
+Benchmark :func:`monoseq.partition_range` against the region scanning
+implementation it replaced.
+
+Run with ``python benchmarks/partition_range.py`` from the repository root.
+
+.. Licensed under the MIT license, see the LICENSE.rst file.
+"""
+
+
+from __future__ import print_function
+
+import itertools
+import random
+import timeit
+
+from monoseq import partition_range
+
+
+#: The region scanning implementation is quadratic, so we only run it up to
+#: this number of regions.
+SCAN_MAX_REGIONS = 10 ** 4
+
+
+def _partition_range_scan(stop, annotations=None):
+    """
+    Partition the range from 0 to `stop` by computing the levels for each
+    breakpoint from scratch (the implementation before monoseq 1.2.2).
+    """
+    annotations = annotations or []
+
+    partitioning = []
+    part_start, part_levels = 0, None
+
+    for p in sorted(set(itertools.chain([0, stop],
+                                        *itertools.chain(*annotations)))):
+        if p == stop:
+            partitioning.append( (part_start, p, part_levels) )
+            break
+
+        levels = {level for level, regions in enumerate(annotations)
+                  if any(x <= p < y for x, y in regions)}
+
+        if p == 0:
+            part_levels = levels
+            continue
+
+        if levels != part_levels:
+            partitioning.append( (part_start, p, part_levels) )
+            part_start, part_levels = p, levels
+
+    return partitioning
+
+
+def random_annotations(stop, regions, levels=3, max_length=500, seed=None):
+    """
+    Generate `levels` annotation levels with a total of `regions` random
+    regions in the range from 0 to `stop`.
+    """
+    rng = random.Random(seed)
+    annotations = [[] for _ in range(levels)]
+    for i in range(regions):
+        start = rng.randrange(stop)
+        annotations[i % levels].append(
+            (start, min(start + rng.randint(1, max_length), stop)))
+    return annotations
+
+
+def bench(function, stop, annotations, repeat=3):
+    """
+    Best wall time in seconds of `repeat` calls to `function`.
+    """
+    return min(timeit.repeat(lambda: function(stop, annotations),
+                             number=1, repeat=repeat))
+
+
+def main():
+    """
+    Print a table with timings for 10^3 to 10^6 regions.
+    """
+    print('{:>10} {:>12} {:>12}'.format('regions', 'sweep (s)', 'scan (s)'))
+    for exponent in range(3, 7):
+        regions = 10 ** exponent
+        stop = regions * 100
+        annotations = random_annotations(stop, regions, seed=exponent)
+
+        sweep = bench(partition_range, stop, annotations)
+        if regions <= SCAN_MAX_REGIONS:
+            assert (partition_range(stop, annotations) ==
+                    _partition_range_scan(stop, annotations))
+            scan = '{:12.4f}'.format(bench(_partition_range_scan, stop,
+                                           annotations, repeat=1))
+        else:
+            scan = '{:>12}'.format('-')
+
+        print('{:>10} {:12.4f} {}'.format(regions, sweep, scan))
+
+
+if __name__ == '__main__':
+    main()
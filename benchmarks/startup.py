@@ -0,0 +1,113 @@
+"""
+Benchmark startup time of the ``monoseq`` command line interface.
+
+Run with ``python benchmarks/startup.py`` from the repository root. This uses
+``python -X importtime`` and therefore requires Python 3.7 or higher.
+
+The import time of each ``monoseq`` module is measured as reported by
+``-X importtime``, taking the best of a number of runs. The total import
+time is the sum of the top-level ``monoseq`` entries, which depending on the
+Python version includes the :mod:`monoseq` package separately from
+:mod:`monoseq.commands`. The exit status is nonzero if it exceeds the budget
+set with ``--budget``.
+
+.. Licensed under the MIT license, see the LICENSE.rst file.
+"""
+
+
+from __future__ import print_function
+
+import argparse
+import os
+import subprocess
+import sys
+import timeit
+
+
+def import_times(module, env):
+    """
+    Import `module` in a fresh process and return a dictionary with the
+    cumulative import time in milliseconds for each ``monoseq`` module, and
+    the sum of these for the top-level ``monoseq`` entries.
+    """
+    output = subprocess.check_output(
+        [sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+        stderr=subprocess.STDOUT, env=env).decode('utf-8')
+    times = {}
+    total = 0.0
+    for line in output.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        # Nested imports are indented by two spaces per level.
+        top_level = not name[1:].startswith(' ')
+        name = name.strip()
+        if name.startswith('monoseq'):
+            times[name] = int(cumulative) / 1000.0
+            if top_level:
+                total += times[name]
+    return times, total
+
+
+def run_time(args, env, stdin):
+    """
+    Wall time in milliseconds for running Python with `args`.
+    """
+    start = timeit.default_timer()
+    subprocess.check_call([sys.executable] + args, env=env, stdin=stdin,
+                          stdout=subprocess.PIPE)
+    return (timeit.default_timer() - start) * 1000
+
+
+def main():
+    """
+    Print a table with startup times and check the budget.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--runs', metavar='N', type=int, default=20,
+        help='number of runs (default: 20)')
+    parser.add_argument(
+        '--budget', metavar='MS', type=float, default=20.0,
+        help='maximum total import time of monoseq in milliseconds '
+        '(default: 20)')
+    args = parser.parse_args()
+
+    # Make sure bytecode is written and used, as it is for installed
+    # packages.
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [os.getcwd()] + env.get('PYTHONPATH', '').split(os.pathsep))
+    import_times('monoseq.commands', env)
+
+    best = {}
+    best_total = None
+    for _ in range(args.runs):
+        times, total = import_times('monoseq.commands', env)
+        for name, milliseconds in times.items():
+            best[name] = min(best.get(name, milliseconds), milliseconds)
+        best_total = total if best_total is None else min(best_total, total)
+
+    print('{:<24} {:>10}'.format('module', 'import (ms)'))
+    for name in sorted(best):
+        print('{:<24} {:10.1f}'.format(name, best[name]))
+    print('{:<24} {:10.1f}'.format('total', best_total))
+
+    with open(os.devnull) as devnull:
+        python = min(run_time(['-c', 'pass'], env, devnull)
+                     for _ in range(args.runs))
+    with open(os.devnull) as devnull:
+        monoseq = min(run_time(['-m', 'monoseq.commands'], env, devnull)
+                      for _ in range(args.runs))
+    print()
+    print('{:<24} {:10.1f}'.format('python (ms)', python))
+    print('{:<24} {:10.1f}'.format('monoseq (ms)', monoseq))
+
+    if best_total > args.budget:
+        sys.exit('import time of monoseq exceeds budget of %.1f ms'
+                 % args.budget)
+
+
+if __name__ == '__main__':
+    main()
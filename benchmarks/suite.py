@@ -0,0 +1,248 @@
+"""
+Benchmark suite for ``monoseq``.
+
+Run with ``python benchmarks/suite.py`` from the repository root. For each
+benchmark, the best wall time and the peak memory allocated (as traced by
+:mod:`tracemalloc`, so Python 3.4 or higher is required) are reported.
+
+Results can be saved with ``--save FILE`` and compared to earlier results
+with ``--compare FILE``. In the latter case, the exit status is nonzero if
+any benchmark is slower or uses more memory than allowed by ``--threshold``.
+
+.. Licensed under the MIT license, see the LICENSE.rst file.
+"""
+
+
+from __future__ import print_function
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+from monoseq import (AnsiFormat, HtmlFormat, partition_range,
+                     PlaintextFormat, pprint_sequence)
+from monoseq.commands import pprint
+
+from partition_range import random_annotations
+from fasta_memory import write_fasta
+
+
+FORMATS = [('plaintext', PlaintextFormat),
+           ('ansi', AnsiFormat),
+           ('html', HtmlFormat)]
+
+
+def random_sequence(length, seed=None):
+    """
+    Random DNA sequence of length `length`.
+    """
+    rng = random.Random(seed)
+    block = ''.join(rng.choice('ACGT') for _ in range(10000))
+    return (block * (length // len(block) + 1))[:length]
+
+
+def bench_partition_range(max_regions):
+    """
+    Benchmarks for :func:`monoseq.partition_range` with varying numbers of
+    regions and levels.
+    """
+    for exponent in range(3, 7):
+        regions = 10 ** exponent
+        if regions > max_regions:
+            break
+        for levels in (1, 3, 10):
+            stop = regions * 100
+            annotations = random_annotations(stop, regions, levels=levels,
+                                             seed=exponent)
+            yield ('partition_range/regions=%i/levels=%i' % (regions, levels),
+                   lambda stop=stop, annotations=annotations:
+                   partition_range(stop, annotations))
+
+
+def bench_pprint_sequence(max_length):
+    """
+    Benchmarks for :func:`monoseq.pprint_sequence` with each built-in format
+    and varying sequence lengths.
+    """
+    for exponent in range(3, 9):
+        length = 10 ** exponent
+        if length > max_length:
+            break
+        sequence = random_sequence(length, seed=exponent)
+        # About one annotated region every 500 positions.
+        annotations = random_annotations(length, max(length // 500, 1),
+                                         levels=2, max_length=100,
+                                         seed=exponent)
+        for name, format in FORMATS:
+            yield ('pprint_sequence/length=%i/format=%s' % (length, name),
+                   lambda sequence=sequence, annotations=annotations,
+                   format=format:
+                   pprint_sequence(sequence, annotations=annotations,
+                                   format=format))
+
+
+def bench_commands(max_length, directory):
+    """
+    Benchmarks for :func:`monoseq.commands.pprint` on FASTA files with a BED
+    track.
+    """
+    for exponent in range(3, 9):
+        length = 10 ** exponent
+        if length > max_length:
+            break
+        fasta_path = os.path.join(directory, 'bench-%i.fa' % length)
+        bed_path = os.path.join(directory, 'bench-%i.bed' % length)
+        write_fasta(fasta_path, length, seed=exponent)
+        with open(bed_path, 'w') as bed:
+            for start, stop in random_annotations(
+                    length, max(length // 500, 1), levels=1, max_length=100,
+                    seed=exponent)[0]:
+                bed.write('chr1\t%i\t%i\n' % (start, stop))
+        yield ('commands.pprint/length=%i' % length,
+               lambda fasta_path=fasta_path, bed_path=bed_path:
+               _pprint_files(fasta_path, bed_path))
+
+
+def _pprint_files(fasta_path, bed_path):
+    """
+    Run :func:`monoseq.commands.pprint` with output to ``/dev/null``.
+    """
+    with open(fasta_path, 'rb') as fasta, open(bed_path) as bed:
+        with _redirect_stdout(os.devnull):
+            pprint(fasta, annotation_file=bed)
+
+
+@contextlib.contextmanager
+def _redirect_stdout(path):
+    """
+    Context manager redirecting standard output to `path`.
+    """
+    stdout = sys.stdout
+    with open(path, 'w') as output:
+        sys.stdout = output
+        try:
+            yield
+        finally:
+            sys.stdout = stdout
+
+
+def measure(function, repeat):
+    """
+    Return a tuple of the best wall time in seconds of `repeat` calls to
+    `function` and the peak memory in megabytes allocated in one more call.
+    """
+    seconds = min(timeit.repeat(function, number=1, repeat=repeat))
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 1024.0 ** 2
+
+
+#: Times (in seconds) and memory peaks (in megabytes) below these values are
+#: too noisy to compare and are rounded up to them.
+TIME_FLOOR = 0.01
+MEMORY_FLOOR = 1.0
+
+
+def _ratio(value, baseline, floor):
+    """
+    Ratio of `value` to `baseline`, both rounded up to `floor`.
+    """
+    return max(value, floor) / max(baseline, floor)
+
+
+def compare(results, baseline, threshold):
+    """
+    Print a comparison of `results` with `baseline` and return the names of
+    benchmarks that regressed by more than `threshold`.
+    """
+    regressions = []
+    print()
+    print('{:<48} {:>10} {:>10}'.format('benchmark', 'time', 'memory'))
+    for name in sorted(results):
+        if name not in baseline:
+            continue
+        time_ratio = _ratio(results[name]['time'], baseline[name]['time'],
+                            TIME_FLOOR)
+        memory_ratio = _ratio(results[name]['memory'],
+                              baseline[name]['memory'], MEMORY_FLOOR)
+        regressed = max(time_ratio, memory_ratio) > 1 + threshold
+        if regressed:
+            regressions.append(name)
+        print('{:<48} {:>9.2f}x {:>9.2f}x{}'.format(
+            name, time_ratio, memory_ratio, '  REGRESSION' if regressed
+            else ''))
+    return regressions
+
+
+def main():
+    """
+    Run the benchmark suite.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '-k', '--filter', metavar='TEXT', default='',
+        help='only run benchmarks with TEXT in their name')
+    parser.add_argument(
+        '--max-regions', metavar='N', type=int, default=10 ** 6,
+        help='maximum number of regions (default: 10^6)')
+    parser.add_argument(
+        '--max-length', metavar='N', type=int, default=10 ** 8,
+        help='maximum sequence length (default: 10^8)')
+    parser.add_argument(
+        '--repeat', metavar='N', type=int, default=3,
+        help='number of timed runs per benchmark (default: 3)')
+    parser.add_argument(
+        '--save', metavar='FILE', help='save results to FILE')
+    parser.add_argument(
+        '--compare', metavar='FILE',
+        help='compare results to earlier results in FILE')
+    parser.add_argument(
+        '--threshold', metavar='FRACTION', type=float, default=0.2,
+        help='allowed slowdown or memory increase as a fraction '
+        '(default: 0.2)')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    results = {}
+
+    print('{:<48} {:>10} {:>12}'.format('benchmark', 'time (s)',
+                                        'memory (MB)'))
+    try:
+        benchmarks = (
+            list(bench_partition_range(args.max_regions)) +
+            list(bench_pprint_sequence(args.max_length)) +
+            list(bench_commands(args.max_length, directory)))
+        for name, function in benchmarks:
+            if args.filter not in name:
+                continue
+            seconds, memory = measure(function, args.repeat)
+            results[name] = {'time': seconds, 'memory': memory}
+            print('{:<48} {:10.4f} {:12.1f}'.format(name, seconds, memory))
+            sys.stdout.flush()
+    finally:
+        shutil.rmtree(directory)
+
+    if args.save:
+        with open(args.save, 'w') as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            regressions = compare(results, json.load(baseline),
+                                  args.threshold)
+        if regressions:
+            sys.exit('%i benchmark(s) regressed by more than %i%%'
+                     % (len(regressions), args.threshold * 100))
+
+
+if __name__ == '__main__':
+    main()
@@ -8,8 +8,10 @@ using a monospace font.
 """
 
 
-from .monoseq import (AnsiFormat, Format, HtmlFormat, partition_range,
-                      PlaintextFormat, pprint_sequence)
+from .monoseq import (AnsiFormat, Format, HtmlFormat, iter_pprint_sequence,
+                      partition_range, PlaintextFormat, pprint_sequence,
+                      pprint_sequences, Regions, Renderer)
+from .stats import Stats
 
 
 # We follow a versioning scheme compatible with setuptools [1] where the
@@ -0,0 +1,74 @@
+"""
+Pretty-printing sequences from :mod:`asyncio` applications.
+
+This module requires Python 3.6 or higher.
+
+.. moduleauthor:: Martijn Vermaat <martijn@vermaat.name>
+
+.. Licensed under the MIT license, see the LICENSE.rst file.
+"""
+
+
+import asyncio
+
+from .monoseq import (_chunk_tasks, _iter_lines, _pprint_lines, _prepare,
+                      PlaintextFormat)
+
+
+async def apprint_sequence(sequence, annotations=None, block_length=10,
+                           blocks_per_line=6, format=PlaintextFormat,
+                           start=None, stop=None, chunk_lines=100,
+                           executor=None):
+    """
+    Pretty-print sequence for use with a monospace font, asynchronously
+    yielding chunks of output.
+
+        >>> async def handler(request):
+        ...     response = web.StreamResponse()
+        ...     await response.prepare(request)
+        ...     async for chunk in apprint_sequence(sequence,
+        ...                                         format=HtmlFormat):
+        ...         await response.write(chunk.encode('utf-8'))
+        ...     return response
+
+    :arg chunk_lines: Number of lines to pretty-print per chunk.
+    :type chunk_lines: int
+    :arg executor: Executor to pretty-print chunks in. If `None`, the default
+        executor of the event loop is used. With a
+        :class:`concurrent.futures.ProcessPoolExecutor`, annotations and
+        slices of the sequence must be picklable.
+    :type executor: :class:`concurrent.futures.Executor`
+
+    :return: Asynchronous iterator over chunks of the pretty-printed version
+        of `sequence`. Concatenated, they are equal to the result of
+        :func:`monoseq.pprint_sequence`.
+    :rtype: asynchronous iterator(str)
+
+    All work is done in executors, so the event loop is never blocked for
+    longer than it takes to slice a chunk from `sequence`. Chunks are
+    pretty-printed as they are requested, so a slow consumer is not flooded
+    with output and only one chunk is in memory at any time. For a
+    description of the other arguments, see
+    :func:`monoseq.pprint_sequence`.
+    """
+    loop = asyncio.get_event_loop()
+
+    # Partitioning the annotations can take a while, but does not need to
+    # be picklable, so it is done in the default executor.
+    renderer, start, stop, partitioning, margin = await loop.run_in_executor(
+        None, _prepare, sequence, annotations, format, start, stop)
+
+    if start == stop:
+        # An empty region still gets one line with only the margin.
+        yield '\n'.join(_iter_lines(sequence, partitioning, start, stop,
+                                    margin, block_length, blocks_per_line,
+                                    renderer))
+        return
+
+    separator = ''
+    for task in _chunk_tasks(sequence, partitioning, start, stop, margin,
+                             block_length, blocks_per_line, renderer,
+                             chunk_lines):
+        lines = await loop.run_in_executor(executor, _pprint_lines, *task)
+        yield separator + '\n'.join(lines)
+        separator = '\n'
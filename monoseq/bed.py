@@ -0,0 +1,108 @@
+"""
+Reading and indexing annotation regions from BED files for use with
+``monoseq``.
+
+.. moduleauthor:: Martijn Vermaat <martijn@vermaat.name>
+
+.. Licensed under the MIT license, see the LICENSE.rst file.
+"""
+
+
+import bisect
+import collections
+
+
+def read_bed(bed):
+    """
+    Given an open BED file (in text or binary mode), yield tuples of
+    (`chrom`, `start`, `stop`).
+
+    Header lines (``browser`` and ``track`` lines), comments, and empty lines
+    are skipped.
+    """
+    for line in bed:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if (not line.strip() or
+            line.startswith(('browser', 'track', '#'))):
+            continue
+        chrom, start, stop = line.split()[:3]
+        yield chrom, int(start), int(stop)
+
+
+class BedIndex(object):
+    """
+    Annotation regions indexed by chromosome.
+
+        >>> with open('genes.bed') as bed:
+        ...     index = BedIndex(read_bed(bed))
+        >>> index.overlapping('chr7', 127471195, 127472363)
+        [(127471196, 127472363)]
+
+    :arg regions: Iterable of (`chrom`, `start`, `stop`) tuples, in any
+        order.
+
+    Regions for each chromosome are kept sorted, so regions overlapping a
+    range can be found without looking at all regions for the chromosome.
+    """
+    def __init__(self, regions=()):
+        by_chrom = collections.OrderedDict()
+        for chrom, start, stop in regions:
+            by_chrom.setdefault(chrom, []).append( (start, stop) )
+
+        # For each chromosome, a tuple of (`starts`, `stops`, `max_stops`),
+        # where `max_stops[i]` is the maximum of `stops[:i + 1]`.
+        self._index = collections.OrderedDict()
+        for chrom, chrom_regions in by_chrom.items():
+            chrom_regions.sort()
+            starts = [start for start, _ in chrom_regions]
+            stops = [stop for _, stop in chrom_regions]
+            max_stops = []
+            max_stop = None
+            for stop in stops:
+                max_stop = stop if max_stop is None else max(max_stop, stop)
+                max_stops.append(max_stop)
+            self._index[chrom] = starts, stops, max_stops
+
+    def __contains__(self, chrom):
+        return chrom in self._index
+
+    def __len__(self):
+        return sum(len(starts) for starts, _, _ in self._index.values())
+
+    def chroms(self):
+        """
+        Chromosomes with regions, in order of first appearance.
+
+        :rtype: list(str)
+        """
+        return list(self._index)
+
+    def overlapping(self, chrom, start=None, stop=None):
+        """
+        Regions on `chrom` overlapping the range from `start` to `stop`.
+
+        :arg chrom: Chromosome name.
+        :type chrom: str
+        :arg start: Start of the range (default: no limit).
+        :type start: int
+        :arg stop: End (not included) of the range (default: no limit).
+        :type stop: int
+
+        :return: Overlapping regions as (`start`, `stop`) tuples, sorted by
+            start position.
+        :rtype: list
+        """
+        if chrom not in self._index:
+            return []
+
+        starts, stops, max_stops = self._index[chrom]
+
+        # Regions starting after the range are not overlapping and neither
+        # are regions before the first region that stops after the range
+        # starts.
+        lo = 0 if start is None else bisect.bisect_right(max_stops, start)
+        hi = len(starts) if stop is None else bisect.bisect_left(starts, stop)
+
+        return [(starts[i], stops[i]) for i in range(lo, hi)
+                if start is None or stops[i] > start]
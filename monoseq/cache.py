@@ -0,0 +1,237 @@
+"""
+Caching pretty-printed sequences on disk.
+
+.. moduleauthor:: Martijn Vermaat <martijn@vermaat.name>
+
+.. Licensed under the MIT license, see the LICENSE.rst file.
+"""
+
+
+import hashlib
+import io
+import os
+
+from .monoseq import _annotation_regions, PlaintextFormat, Renderer
+
+
+#: Default maximum size in bytes of the files in a cache directory.
+MAX_SIZE = 1024 ** 3
+
+#: Constructor for the hash objects used for cache keys (see
+#: :mod:`hashlib`).
+HASH = hashlib.sha256
+
+#: Number of entries stored by a :class:`Cache` object after which the size
+#: of the cache directory is determined again (other processes can store
+#: entries as well).
+EVICT_INTERVAL = 1000
+
+#: Name of the subdirectory of a cache directory with the cache entries.
+#: Only files in this subdirectory are ever removed.
+ENTRIES_DIRECTORY = 'monoseq-v1'
+
+# Prefix for temporary files in the entries directory.
+_TEMPORARY_PREFIX = '.tmp-'
+
+# Atomically rename a file, replacing any existing file (os.replace is not
+# available on Python 2, but os.rename does the same on Unix).
+_replace = getattr(os, 'replace', os.rename)
+
+
+def digest(data):
+    """
+    Hex digest of a sequence as used by :class:`Cache`.
+
+    :arg data: Sequence data as ASCII encoded bytes.
+    :type data: bytes
+
+    :rtype: str
+    """
+    return HASH(data).hexdigest()
+
+
+class Cache(object):
+    """
+    Directory with pretty-printed sequences, for use with
+    :func:`monoseq.pprint_sequence` and :func:`monoseq.iter_pprint_sequence`.
+
+        >>> cache = Cache('monoseq-cache')
+        >>> pprinted = pprint_sequence(sequence, annotations, cache=cache)
+        >>> pprinted = pprint_sequence(sequence, annotations, cache=cache)
+
+    The second call reads the result of the first one from the cache.
+
+    :arg directory: Path to the cache directory, it is created if it does not
+        exist. Entries are stored in its :data:`ENTRIES_DIRECTORY`
+        subdirectory, other files in the directory are left alone.
+    :type directory: str
+    :arg max_size: Maximum total size in bytes of the files in the cache.
+        When it is exceeded, the least recently used files are removed.
+    :type max_size: int
+
+    Cache entries are content-addressed: their name is a hash of the
+    sequence and of everything else that affects the output. They never
+    become stale and can be shared by different processes. Entries are first
+    written to a temporary file, which is renamed when complete.
+
+    A running total of the size of the cache is kept, so the cache directory
+    is only scanned for entries to remove when the total exceeds `max_size`,
+    and after every :data:`EVICT_INTERVAL` stored entries.
+    """
+    def __init__(self, directory, max_size=MAX_SIZE):
+        self.directory = directory
+        #: Path to the subdirectory with the cache entries.
+        self.entries_directory = os.path.join(directory, ENTRIES_DIRECTORY)
+        self.max_size = max_size
+        # Total size of the cache as of the last scan plus the sizes of the
+        # entries stored since, or `None` if it was not scanned yet.
+        self._size = None
+        self._stored = 0
+        try:
+            os.makedirs(self.entries_directory)
+        except OSError:
+            if not os.path.isdir(self.entries_directory):
+                raise
+
+    def key(self, sequence, annotations=None, block_length=10,
+            blocks_per_line=6, format=PlaintextFormat, start=None,
+            stop=None):
+        """
+        Key of the cache entry for pretty-printing `sequence`. For a
+        description of the arguments, see :func:`monoseq.pprint_sequence`.
+
+        :rtype: str
+
+        Only the region from `start` to `stop` of `sequence` is read. If the
+        complete sequence is selected and `sequence` has a `digest` attribute,
+        it is used instead of reading the sequence at all. This must be the
+        result of :func:`digest` on the sequence.
+        """
+        if isinstance(format, Renderer):
+            format = format.format
+
+        start, stop, _ = slice(start, stop).indices(len(sequence))
+        stop = max(start, stop)
+
+        sequence_digest = None
+        if (start, stop) == (0, len(sequence)):
+            sequence_digest = getattr(sequence, 'digest', None)
+        if sequence_digest is None:
+            sequence_digest = digest(
+                str(sequence[start:stop]).encode('utf-8'))
+
+        # Only annotation levels supported by the format and only regions
+        # overlapping the selected region affect the output.
+        levels = _annotation_regions(
+            (annotations or [])[:len(format.annotations)])
+        levels = [sorted((max(int(x), start), min(int(y), stop))
+                         for x, y in regions if x < stop and y > start)
+                  for regions in levels]
+
+        parts = [sequence_digest, len(sequence), start, stop, levels,
+                 block_length, blocks_per_line, format]
+        return digest(repr(parts).encode('utf-8'))
+
+    def lines(self, key):
+        """
+        Cached lines for `key`.
+
+        :return: Iterator over the lines (without line endings), or `None`
+            if there is no entry for `key`.
+        :rtype: iterator(str)
+        """
+        path = self._path(key)
+        try:
+            cached = io.open(path, 'rb')
+        except (IOError, OSError):
+            return None
+
+        # The modification time is used to find the least recently used
+        # entries.
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+        return _read_lines(cached)
+
+    def store(self, key, lines):
+        """
+        Store lines in the cache for `key`.
+
+        :arg lines: Lines (without line endings).
+        :type lines: iterable(str)
+
+        :return: Iterator over `lines`, they are stored as they are consumed.
+            The entry is only added to the cache if all lines are consumed.
+        :rtype: iterator(str)
+        """
+        import tempfile
+
+        handle, path = tempfile.mkstemp(dir=self.entries_directory,
+                                        prefix=_TEMPORARY_PREFIX)
+        temporary = io.open(handle, 'wb')
+        try:
+            for line in lines:
+                temporary.write(line.encode('utf-8') + b'\n')
+                yield line
+            size = temporary.tell()
+            temporary.close()
+            _replace(path, self._path(key))
+        except BaseException:
+            temporary.close()
+            os.remove(path)
+            raise
+
+        self._stored += 1
+        if self._size is not None:
+            self._size += size
+        if (self._size is None or self._size > self.max_size or
+            self._stored % EVICT_INTERVAL == 0):
+            self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the total size of the
+        cache is at most :attr:`max_size`.
+        """
+        entries = []
+        total = 0
+        for name in os.listdir(self.entries_directory):
+            if name.startswith(_TEMPORARY_PREFIX):
+                continue
+            path = os.path.join(self.entries_directory, name)
+            try:
+                status = os.stat(path)
+            except OSError:
+                # Removed by another process.
+                continue
+            entries.append( (status.st_mtime, status.st_size, path) )
+            total += status.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+        self._size = total
+
+    def _path(self, key):
+        return os.path.join(self.entries_directory, key)
+
+
+def _read_lines(cached):
+    """
+    Yield the lines (without line endings) from an open cache entry in binary
+    mode as native strings, and close it.
+    """
+    # On Python 2, native strings are bytes.
+    decode = str is not bytes
+    with cached:
+        for line in cached:
+            yield line[:-1].decode('utf-8') if decode else line[:-1]
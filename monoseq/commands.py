@@ -7,123 +7,783 @@ Command line interface to ``monoseq``.
 """
 
 
-from __future__ import print_function
-
 import argparse
-import collections
+import contextlib
+import heapq
 import itertools
 import sys
 
-from .monoseq import AnsiFormat, pprint_sequence
+from .bed import BedIndex, read_bed
+from .compression import BGZF, compression, decompressed
+from .monoseq import (AnsiFormat, iter_pprint_sequence, pprint_sequences,
+                      Renderer)
+from .stats import Stats
+
+
+#: Size in bytes of the buffers used for reading input and writing output.
+BUFFER_SIZE = 1024 * 1024
+
+#: Size in bytes of the output buffer if output is to a terminal.
+TTY_BUFFER_SIZE = 8 * 1024
+
+#: With more than one job, records of at least this length are
+#: pretty-printed in parallel chunks of lines, and shorter records are sent
+#: to worker processes in chunks of about this total length.
+PARALLEL_LENGTH = 1024 * 1024
+
+# Bytes removed from FASTA sequence data.
+_WHITESPACE = b' \t\n\r\x0b\x0c'
 
 
-def _until_eof(stream):
+class _Output(object):
     """
-    Yield lines from an open file.
+    Buffered writer of lines to an open file in binary mode.
 
-    Iterating over `sys.stdin` continues after EOF marker. This is annoying,
-    since it means having to type ``^D`` twice to stop. Wrap this function
-    around the stream to stop at the first EOF marker.
+    Lines are collected until they are about `buffer_size` bytes long, and
+    then encoded and written at once. If `stream` is a terminal, a smaller
+    buffer is used so output still appears incrementally. If `stats` is
+    given, writing is timed and the bytes written are counted.
     """
-    while True:
-        line = stream.readline()
-        if line == '':
-            break
-        yield line
+    def __init__(self, stream, buffer_size=BUFFER_SIZE, stats=None):
+        self._stream = stream
+        self._stats = stats
+        self._buffer_size = buffer_size
+        try:
+            if stream.isatty():
+                self._buffer_size = min(buffer_size, TTY_BUFFER_SIZE)
+        except (AttributeError, ValueError):
+            pass
+        self._lines = []
+        self._size = 0
 
+    def write_line(self, line):
+        """
+        Write one line (without line ending).
+        """
+        self._lines.append(line)
+        self._size += len(line) + 1
+        if self._size >= self._buffer_size:
+            self.flush()
 
-def _fasta_iter(fasta):
+    def write_lines(self, lines):
+        """
+        Write lines (without line endings) from an iterable.
+        """
+        for line in lines:
+            self._lines.append(line)
+            self._size += len(line) + 1
+            if self._size >= self._buffer_size:
+                self.flush()
+
+    def flush(self):
+        """
+        Write all buffered lines to the underlying file.
+        """
+        with _stage(self._stats, 'write'):
+            if self._lines:
+                self._lines.append('')
+                data = '\n'.join(self._lines).encode('utf-8')
+                self._stream.write(data)
+                if self._stats is not None:
+                    self._stats.add_count('bytes', len(data))
+                self._lines = []
+                self._size = 0
+            self._stream.flush()
+
+
+@contextlib.contextmanager
+def _stage(stats, stage):
     """
-    Given an open FASTA file, yield tuples of (`header`, `sequence`).
+    Context manager timing `stage` if `stats` is not `None`.
     """
-    # Adapted from Brent Pedersen.
-    # http://www.biostars.org/p/710/#1412
-    groups = (group for _, group in
-              itertools.groupby(fasta, lambda line: line.startswith('>')))
-    for group in groups:
-        header = next(group)[1:].strip()
-        sequence = ''.join(line.strip() for line in next(groups))
-        yield header, sequence
+    if stats is None:
+        yield
+    else:
+        with stats.stage(stage):
+            yield
 
 
-def _bed_iter(bed):
+def _stdout():
     """
-    Given an open BED file, yield tuples of (`chrom`, `chrom_iter`) where
-    `chrom_iter` yields tuples of (`start`, `stop`).
+    Standard output in binary mode.
     """
-    records = (line.split()[:3] for line in bed if
-               not (line.startswith('browser') or line.startswith('track')))
+    sys.stdout.flush()
+    return getattr(sys.stdout, 'buffer', sys.stdout)
+
+
+def _blocks(stream):
+    """
+    Yield blocks of :data:`BUFFER_SIZE` bytes read from an open file in
+    binary mode.
+    """
+    return iter(lambda: stream.read(BUFFER_SIZE), b'')
+
+
+class _SequenceStream(object):
+    """
+    Sequence of known length read lazily from an iterator over chunks.
+
+    Slices must be requested in order of their start positions (this is what
+    :func:`monoseq.iter_pprint_sequence` does). Data before the start of the
+    last requested slice is discarded, so only a few chunks are kept in memory
+    at any time.
+    """
+    def __init__(self, chunks, length, digest=None):
+        self._chunks = iter(chunks)
+        self._length = length
+        #: Digest of the sequence (see :func:`monoseq.cache.digest`), or
+        #: `None` if it is not known.
+        self.digest = digest
+        self._buffer = ''
+        self._offset = 0
+        self._position = 0
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, key):
+        start, stop, _ = key.indices(self._length)
+        if start < self._position:
+            raise IndexError('sequence stream cannot go back to position %i'
+                             % start)
+        self._position = start
+
+        # Read chunks until the buffer contains all of the slice, dropping
+        # data before the start of the slice. Chunks can be large, so the
+        # buffer is only sliced when a chunk is added.
+        while self._offset + len(self._buffer) < stop:
+            try:
+                chunk = next(self._chunks)
+            except StopIteration:
+                break
+            consumed = min(start - self._offset, len(self._buffer))
+            self._buffer = self._buffer[consumed:] + chunk
+            self._offset += consumed
 
-    for chrom, chrom_iter in itertools.groupby(records, lambda x: x[0]):
-        yield chrom, ((int(start), int(stop))
-                      for _, start, stop in chrom_iter)
+        return self._buffer[start - self._offset:stop - self._offset]
+
+
+def _fasta_stream_iter(fasta, stats=None, hash_type=None):
+    """
+    Given an open and seekable FASTA file in binary mode, yield tuples of
+    (`header`, `sequence`) where `sequence` is read lazily from the file.
+
+    The file is read twice: once to find the length of each record, and once
+    more while the records are consumed. Both are done in large blocks,
+    looking for headers in each block instead of reading line by line. If
+    `stats` is given, both are timed and records are counted.
+
+    If `hash_type` is given (see :func:`_fasta_records`), the `digest`
+    attribute of each sequence is set while finding its length.
+    """
+    with _stage(stats, 'index FASTA'):
+        records = _fasta_records(fasta, hash_type=hash_type)
+
+    for header, offset, length, digest in records:
+        chunks = _sequence_chunks(fasta, offset)
+        if stats is not None:
+            stats.add_count('records')
+            chunks = stats.timed(chunks, 'read FASTA')
+        yield header, _SequenceStream(chunks, length, digest=digest)
+
+
+def _fasta_records(fasta, hash_type=None):
+    """
+    Given an open FASTA file in binary mode, return a list with for each
+    record a tuple of (`header`, `offset`, `length`, `digest`), where
+    `offset` is the offset in the file of its sequence.
+
+    The `digest` of each sequence is computed with `hash_type` (a constructor
+    from :mod:`hashlib`), or is `None` if `hash_type` is not given.
+    """
+    # For each record, its header, the offset of its sequence, and its
+    # length.
+    records = []
+
+    # Parts of the header we are in, or `None` if we are not in a header.
+    header = None
+    at_line_start = True
+    position = fasta.tell()
+
+    for block in _blocks(fasta):
+        i = 0
+        while i < len(block):
+            if header is not None:
+                end = block.find(b'\n', i)
+                if end < 0:
+                    header.append(block[i:])
+                    break
+                header.append(block[i:end])
+                records.append([b''.join(header), position + end + 1, 0,
+                                hash_type and hash_type()])
+                header = None
+                i = end + 1
+                at_line_start = True
+            elif at_line_start and block[i:i + 1] == b'>':
+                header = []
+                i += 1
+            else:
+                end = block.find(b'\n>', i)
+                end = len(block) if end < 0 else end + 1
+                if records:
+                    data = block[i:end].translate(None, _WHITESPACE)
+                    records[-1][2] += len(data)
+                    if hash_type:
+                        records[-1][3].update(data)
+                at_line_start = block[end - 1:end] == b'\n'
+                i = end
+        position += len(block)
+
+    if header is not None:
+        records.append([b''.join(header), position, 0,
+                        hash_type and hash_type()])
+
+    return [(header.decode('utf-8').strip(), offset, length,
+             digest and digest.hexdigest())
+            for header, offset, length, digest in records]
+
+
+def _sequence_chunks(fasta, offset):
+    """
+    Yield chunks of sequence of the FASTA record starting at `offset` in the
+    open file.
+    """
+    fasta.seek(offset)
+    at_line_start = True
+    for block in _blocks(fasta):
+        if at_line_start and block.startswith(b'>'):
+            return
+        end = block.find(b'\n>')
+        if end >= 0:
+            block = block[:end + 1]
+        yield block.translate(None, _WHITESPACE).decode('ascii')
+        if end >= 0:
+            return
+        at_line_start = block.endswith(b'\n')
 
 
-def _pprint_fasta(fasta, annotations=None, annotation_file=None,
-                  block_length=10, blocks_per_line=6):
+def _spool(stream, first_line=b''):
+    """
+    Copy `first_line` and the remainder of `stream` to a temporary file, and
+    return it positioned at the start.
+
+    This makes it possible to use :func:`_fasta_stream_iter` on streams that
+    are not seekable, such as standard input.
+    """
+    # Like other modules only needed for some input, these are imported here
+    # to keep the startup time low.
+    import shutil
+    import tempfile
+
+    spool = tempfile.TemporaryFile()
+    spool.write(first_line)
+    shutil.copyfileobj(stream, spool, BUFFER_SIZE)
+    spool.seek(0)
+    return spool
+
+
+def _region(region):
+    """
+    Parse a region string as CHROM, CHROM:START, or CHROM:START-END (one-based
+    and inclusive) to a tuple (`chrom`, `start`, `stop`) in slicing notation.
+    Missing positions are returned as `None`.
+    """
+    chrom, _, positions = region.rpartition(':')
+    if not chrom:
+        return region, None, None
+    try:
+        first, _, last = positions.partition('-')
+        start = int(first.replace(',', '')) - 1
+        stop = int(last.replace(',', '')) if last else None
+    except ValueError:
+        raise argparse.ArgumentTypeError('invalid region: %s' % region)
+    if start < 0 or (stop is not None and stop <= start):
+        raise argparse.ArgumentTypeError('invalid region: %s' % region)
+    return chrom, start, stop
+
+
+def _region_range(region, length):
+    """
+    Start and stop of a region as returned by :func:`_region` in a record of
+    `length`, with missing positions filled in and `stop` clipped to the end
+    of the record.
+
+    A :exc:`ValueError` is raised if the region starts after the end of the
+    record.
+    """
+    chrom, start, stop = region
+    if start is not None and start >= length:
+        raise ValueError('region outside record: %s:%i (length %i)'
+                         % (chrom, start + 1, length))
+    start, stop, _ = slice(start, stop).indices(length)
+    return start, stop
+
+
+def _sorted_bed_levels(annotation_files, chroms, stats=None):
+    """
+    Given open BED files sorted in the order of `chroms`, yield for each
+    chromosome in `chroms` a list with the regions on that chromosome from
+    each BED file.
+
+    The BED files are merged with a k-way merge and read alongside the
+    chromosomes, so only the regions on one chromosome are kept in memory at
+    any time. Regions on other chromosomes are ignored. Only the order of
+    chromosomes matters, regions on a chromosome need not be sorted. If a BED
+    file is not sorted, a :exc:`ValueError` is raised when this is detected.
+    """
+    order = {}
+    for index, chrom in enumerate(chroms):
+        order.setdefault(chrom, index)
+
+    def indexed(level, bed):
+        last = 0
+        for chrom, start, stop in read_bed(bed):
+            index = order.get(chrom)
+            if index is None:
+                continue
+            if index < last:
+                raise ValueError('BED file is not sorted in the order of '
+                                 'FASTA records: %s' % chrom)
+            last = index
+            yield index, level, start, stop
+
+    merged = heapq.merge(*[indexed(level, bed)
+                           for level, bed in enumerate(annotation_files)])
+    if stats is not None:
+        merged = stats.timed(merged, 'read BED')
+
+    pending = next(merged, None)
+    for index in range(len(chroms)):
+        levels = [[] for _ in annotation_files]
+        while pending is not None and pending[0] == index:
+            _, level, start, stop = pending
+            levels[level].append( (start, stop) )
+            pending = next(merged, None)
+        yield levels
+
+
+def _pprint_fasta(output, fasta, annotations=None, annotation_files=None,
+                  sorted_annotations=False, block_length=10,
+                  blocks_per_line=6, jobs=1, stats=None, cache=None):
     """
     Pretty-print each record in the FASTA file.
+
+    Each BED file in `annotation_files` is used as an annotation level. With
+    `sorted_annotations`, they must be sorted in the order of FASTA records
+    and are read alongside them (see :func:`_sorted_bed_levels`), otherwise
+    they are read completely before pretty-printing the first record.
+
+    Records are pretty-printed with :func:`_pprint_records`.
     """
     annotations = annotations or []
+    annotation_files = annotation_files or []
+    renderer = Renderer(AnsiFormat)
 
-    # Annotations by chromosome.
-    as_by_chrom = collections.defaultdict(lambda: [a for a in annotations] or [])
-    if annotation_file:
-        for chrom, chrom_iter in _bed_iter(annotation_file):
-            as_by_chrom[chrom].append(list(chrom_iter))
+    hash_type = None
+    if cache is not None:
+        # Digests of the records are computed while indexing the FASTA file,
+        # so they need not be read twice.
+        from .cache import HASH as hash_type
+
+    def chrom(header):
+        return header.split()[0] if header else ''
+
+    def records():
+        fasta_records = _fasta_stream_iter(fasta, stats=stats,
+                                           hash_type=hash_type)
+        if sorted_annotations:
+            # We need the order of all records before merging BED files.
+            fasta_records = list(fasta_records)
+            bed_levels = _sorted_bed_levels(
+                annotation_files,
+                [chrom(header) for header, _ in fasta_records], stats=stats)
+        else:
+            with _stage(stats, 'read BED'):
+                beds = [BedIndex(read_bed(annotation_file))
+                        for annotation_file in annotation_files]
+        for header, sequence in fasta_records:
+            if sorted_annotations:
+                levels = next(bed_levels)
+            else:
+                levels = [bed.overlapping(chrom(header)) for bed in beds]
+            yield header, sequence, annotations + levels
 
-    for header, sequence in _fasta_iter(fasta):
-        print(header)
-        print(pprint_sequence(sequence,
-                              annotations=as_by_chrom[header.split()[0]],
-                              block_length=block_length,
-                              blocks_per_line=blocks_per_line,
-                              format=AnsiFormat))
+    _pprint_records(output, records(), renderer, block_length=block_length,
+                    blocks_per_line=blocks_per_line, jobs=jobs, stats=stats,
+                    cache=cache)
 
 
-def _pprint_line(line, annotations=None, annotation_file=None,
-                 block_length=10, blocks_per_line=6):
+def _pprint_fastq(output, fastq, annotations=None, annotation_files=None,
+                  quality_thresholds=None, block_length=10, blocks_per_line=6,
+                  jobs=1, stats=None):
+    """
+    Pretty-print each read in the FASTQ file.
+
+    For each threshold in `quality_thresholds`, bases with a quality score
+    below it are annotated in a separate level (see
+    :func:`monoseq.fastq.quality_levels`). These levels come after those in
+    `annotations` and before those from the BED files in `annotation_files`,
+    where regions are matched by read name.
+
+    Reads are read and annotated in batches of
+    :data:`monoseq.fastq.BATCH_SIZE`, so memory use does not depend on the
+    number of reads. With more than one job, reads are pretty-printed in
+    parallel.
+    """
+    from .fastq import BATCH_SIZE, quality_levels, read_fastq
+
+    annotations = annotations or []
+    quality_thresholds = quality_thresholds or []
+    renderer = Renderer(AnsiFormat)
+
+    with _stage(stats, 'read BED'):
+        beds = [BedIndex(read_bed(annotation_file))
+                for annotation_file in annotation_files or []]
+
+    def records():
+        reads = read_fastq(fastq)
+        if stats is not None:
+            reads = stats.timed(reads, 'read FASTQ')
+        while True:
+            batch = list(itertools.islice(reads, BATCH_SIZE))
+            if not batch:
+                break
+            with _stage(stats, 'annotate qualities'):
+                levels = quality_levels(
+                    [qualities for _, _, qualities in batch],
+                    quality_thresholds)
+            for (header, sequence, _), read_levels in zip(batch, levels):
+                if stats is not None:
+                    stats.add_count('records')
+                name = header.split()[0] if header else ''
+                yield header, sequence, annotations + read_levels + [
+                    bed.overlapping(name) for bed in beds]
+
+    # Reads are not cached. Each read would be a separate cache entry, and
+    # creating a file per read makes a first run several times slower than
+    # not caching at all, while reading short reads back from the cache is
+    # hardly faster than pretty-printing them again.
+    _pprint_records(output, records(), renderer, block_length=block_length,
+                    blocks_per_line=blocks_per_line, jobs=jobs, stats=stats)
+
+
+def _pprint_records(output, records, renderer, block_length=10,
+                    blocks_per_line=6, jobs=1, stats=None, cache=None):
+    """
+    Pretty-print records given as tuples of (`header`, `sequence`,
+    `annotations`), each after a line with its header.
+
+    With more than one job, records shorter than :data:`PARALLEL_LENGTH` are
+    pretty-printed in parallel, sent to worker processes in chunks of about
+    that total length and read into memory while in progress. Longer records
+    are each pretty-printed in parallel chunks of lines, so memory use does
+    not depend on the record lengths. With a `cache`, records are
+    pretty-printed one at a time.
+    """
+    if jobs > 1 and cache is None:
+        for long_records, group in itertools.groupby(
+                records, lambda record: len(record[1]) >= PARALLEL_LENGTH):
+            if long_records:
+                for header, sequence, record_annotations in group:
+                    output.write_line(header)
+                    output.write_lines(iter_pprint_sequence(
+                        sequence, annotations=record_annotations,
+                        block_length=block_length,
+                        blocks_per_line=blocks_per_line, format=renderer,
+                        workers=jobs, stats=stats))
+                continue
+
+            headers, sequences, record_annotations = itertools.tee(group, 3)
+            pprinted = pprint_sequences(
+                (sequence[:] for _, sequence, _ in sequences),
+                annotations=(a for _, _, a in record_annotations),
+                block_length=block_length, blocks_per_line=blocks_per_line,
+                format=renderer, workers=jobs, chunk_length=PARALLEL_LENGTH)
+            for header, _, _ in headers:
+                output.write_line(header)
+                output.write_line(next(pprinted))
+        return
+
+    for header, sequence, record_annotations in records:
+        output.write_line(header)
+        output.write_lines(iter_pprint_sequence(
+            sequence, annotations=record_annotations,
+            block_length=block_length, blocks_per_line=blocks_per_line,
+            format=renderer, stats=stats, cache=cache))
+
+
+def _pprint_line(output, line, annotations=None, annotation_files=None,
+                 block_length=10, blocks_per_line=6, stats=None, cache=None):
     """
     Pretty-print one line.
     """
     annotations = annotations or []
 
-    if annotation_file:
+    for annotation_file in annotation_files or []:
         # We just use the first chromosome defined in the BED file.
-        _, chrom_iter = next(_bed_iter(annotation_file))
-        annotations.append(list(chrom_iter))
+        with _stage(stats, 'read BED'):
+            bed = BedIndex(read_bed(annotation_file))
+        annotations.append(bed.overlapping(bed.chroms()[0])
+                           if bed.chroms() else [])
 
-    print(pprint_sequence(line, annotations=annotations,
-                          block_length=block_length,
-                          blocks_per_line=blocks_per_line, format=AnsiFormat))
+    output.write_lines(iter_pprint_sequence(line, annotations=annotations,
+                                            block_length=block_length,
+                                            blocks_per_line=blocks_per_line,
+                                            format=AnsiFormat, stats=stats,
+                                            cache=cache))
+
+
+def _pprint_region(output, fasta_path, region, annotations=None,
+                   annotation_files=None, block_length=10, blocks_per_line=6,
+                   jobs=1, stats=None, cache=None):
+    """
+    Pretty-print a region of one record in the FASTA file.
+
+    With more than one job, chunks of lines are pretty-printed in parallel.
+    """
+    chrom, start, stop = region
+    annotations = annotations or []
+
+    for annotation_file in annotation_files or []:
+        # Only regions on the selected chromosome are kept.
+        with _stage(stats, 'read BED'):
+            bed = BedIndex(x for x in read_bed(annotation_file)
+                           if x[0] == chrom)
+        annotations.append(bed.overlapping(chrom, start, stop))
+
+    from .fasta import FastaFile
+
+    with FastaFile(fasta_path) as fasta:
+        if chrom not in fasta:
+            raise ValueError('no record in FASTA file: %s' % chrom)
+        sequence = fasta[chrom]
+        start, stop = _region_range(region, len(sequence))
+
+        output.write_line('%s:%i-%i' % (chrom, start + 1, stop))
+        output.write_lines(iter_pprint_sequence(
+            sequence, annotations=annotations, block_length=block_length,
+            blocks_per_line=blocks_per_line, format=AnsiFormat, start=start,
+            stop=stop, workers=jobs, stats=stats, cache=cache))
 
 
 def pprint(sequence_file, annotation=None, annotation_file=None,
-           block_length=10, blocks_per_line=6):
+           block_length=10, blocks_per_line=6, region=None, jobs=1,
+           output_file=None, stats=None, annotation_files=None,
+           sorted_annotations=False, cache=None, quality_thresholds=None):
+    """
+    Pretty-print sequence(s) from an open file in binary mode to
+    `output_file` (an open file in binary mode, default: standard output).
+    The file can contain a raw sequence, or be in FASTA or FASTQ format.
+
+    Each open BED file in `annotation_files` is used as an annotation level,
+    after the level defined by `annotation` (if given). For a single BED
+    file, `annotation_file` can be used instead. If `sorted_annotations` is
+    `True`, the BED files must be sorted in the order of FASTA records and are
+    read alongside them, so only the regions on one chromosome are kept in
+    memory. Otherwise, they are read completely first.
+
+    For FASTQ input, bases with a quality score below each threshold in
+    `quality_thresholds` are annotated in a separate level, after the level
+    defined by `annotation` and before those from BED files. Reads are
+    streamed, so memory use does not depend on the number of reads. They are
+    not stored in `cache`.
+
+    FASTA records are read lazily, so memory use does not depend on the
+    record lengths. If `sequence_file` is not seekable or is compressed
+    (see :func:`monoseq.compression.compression`), FASTA input is first
+    copied to a temporary file.
+
+    If `region` is given as a tuple (`chrom`, `start`, `stop`), only that
+    region is pretty-printed. This requires `sequence_file` to be a FASTA
+    file (uncompressed or compressed with ``bgzip``), which is then accessed
+    through :class:`monoseq.fasta.FastaFile`.
+
+    FASTA records are pretty-printed in parallel by `jobs` worker processes,
+    in batches of at most :data:`PARALLEL_LENGTH` bases. Longer records (and
+    with `region`, the region) are pretty-printed in parallel in chunks of
+    lines.
+
+    Input is read and output is written in blocks of :data:`BUFFER_SIZE`
+    bytes.
+
+    If `stats` is given as a :class:`monoseq.stats.Stats` object, the stages
+    of pretty-printing are timed and processed items are counted in it.
+
+    If `cache` is given as a :class:`monoseq.cache.Cache` object,
+    pretty-printed sequences are read from it if possible and stored in it
+    otherwise.
+    """
+    annotation_files = list(annotation_files or [])
+    if annotation_file:
+        annotation_files.insert(0, annotation_file)
+
+    output = _Output(output_file or _stdout(), stats=stats)
+    try:
+        _pprint(output, sequence_file, annotation=annotation,
+                annotation_files=annotation_files,
+                sorted_annotations=sorted_annotations,
+                block_length=block_length, blocks_per_line=blocks_per_line,
+                region=region, jobs=jobs, stats=stats, cache=cache,
+                quality_thresholds=quality_thresholds)
+    finally:
+        output.flush()
+
+
+def _pprint(output, sequence_file, annotation=None, annotation_files=None,
+            sorted_annotations=False, block_length=10, blocks_per_line=6,
+            region=None, jobs=1, stats=None, cache=None,
+            quality_thresholds=None):
+    """
+    Pretty-print sequence(s) from an open file, see :func:`pprint`.
+    """
+    annotations = []
+
+    if annotation:
+        annotations.append([(first - 1, last) for first, last in annotation])
+
+    if region:
+        _pprint_region(output, sequence_file.name, region,
+                       annotations=annotations,
+                       annotation_files=annotation_files,
+                       block_length=block_length,
+                       blocks_per_line=blocks_per_line, jobs=jobs,
+                       stats=stats, cache=cache)
+        return
+
+    # Compressed input is decompressed while reading. It cannot be read
+    # twice without decompressing it twice, so it is not seeked.
+    if compression(sequence_file):
+        sequence_file = decompressed(sequence_file)
+        offset = None
+    else:
+        try:
+            offset = sequence_file.tell()
+        except (AttributeError, IOError, OSError, ValueError):
+            offset = None
+
+    # Peek to see if this looks like a FASTA or FASTQ file.
+    line = sequence_file.readline()
+    if line.startswith(b'@'):
+        # Reads are streamed, so there is no need to seek.
+        _pprint_fastq(output, itertools.chain([line], sequence_file),
+                      annotations=annotations,
+                      annotation_files=annotation_files,
+                      quality_thresholds=quality_thresholds,
+                      block_length=block_length,
+                      blocks_per_line=blocks_per_line, jobs=jobs,
+                      stats=stats)
+    elif line.startswith(b'>'):
+        if offset is None:
+            fasta = _spool(sequence_file, line)
+        else:
+            sequence_file.seek(offset)
+            fasta = sequence_file
+        _pprint_fasta(output, fasta, annotations=annotations,
+                      annotation_files=annotation_files,
+                      sorted_annotations=sorted_annotations,
+                      block_length=block_length,
+                      blocks_per_line=blocks_per_line, jobs=jobs,
+                      stats=stats, cache=cache)
+    elif line:
+        _pprint_line(output, line.strip().decode('ascii'),
+                     annotations=annotations,
+                     annotation_files=annotation_files,
+                     block_length=block_length,
+                     blocks_per_line=blocks_per_line, stats=stats,
+                     cache=cache)
+
+
+def _serve(address, stdin, stats=None):
+    """
+    Serve requests on standard input (if `address` is ``-``) or on a Unix
+    socket at `address`, see :class:`monoseq.server.Server`.
+    """
+    import signal
+    from .server import Server
+
+    # Exit cleanly on SIGTERM, so the socket is removed.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    with Server(stats=stats) as server:
+        try:
+            if address == '-':
+                server.serve(stdin, _stdout())
+            else:
+                server.serve_socket(address)
+        except KeyboardInterrupt:
+            pass
+
+    if stats is not None:
+        sys.stderr.write(stats.report() + '\n')
+
+
+def _page(sequence_file, annotation=None, annotation_files=None,
+          block_length=10, blocks_per_line=6, region=None):
     """
-    Pretty-print sequence(s) from a file.
+    Show sequence(s) from an open file in binary mode in an interactive
+    pager, see :class:`monoseq.pager.Pager`.
+
+    FASTA records are accessed through :class:`monoseq.fasta.FastaFile`, so
+    only the visible lines are read. If `sequence_file` is not a FASTA file
+    on disk (uncompressed or compressed with ``bgzip``), it is first copied
+    to a temporary file. With `region`, the pager starts at its start.
     """
+    import os
+    import shutil
+    import tempfile
+    from .fasta import FastaFile
+    from .pager import page, Pager
+
     annotations = []
 
     if annotation:
         annotations.append([(first - 1, last) for first, last in annotation])
 
+    beds = [BedIndex(read_bed(annotation_file))
+            for annotation_file in annotation_files or []]
+
+    format = compression(sequence_file)
+    stream = decompressed(sequence_file) if format else sequence_file
+    line = stream.readline()
+
+    if line.startswith(b'@'):
+        raise ValueError('FASTQ input cannot be used with --pager')
+
+    if not line.startswith(b'>'):
+        # We just use the first chromosome defined in the BED files.
+        annotations.extend(bed.overlapping(bed.chroms()[0])
+                           if bed.chroms() else [] for bed in beds)
+        pager = Pager([('', line.strip().decode('ascii'))],
+                      annotations=annotations, block_length=block_length,
+                      blocks_per_line=blocks_per_line)
+        page(pager)
+        return
+
+    path = getattr(sequence_file, 'name', None)
+    spool = None
+    if format not in (None, BGZF) or not os.path.isfile(str(path)):
+        spool = tempfile.NamedTemporaryFile()
+        spool.write(line)
+        shutil.copyfileobj(stream, spool, BUFFER_SIZE)
+        spool.flush()
+        path = spool.name
+
     try:
-        # Peek to see if this looks like a FASTA file.
-        line = next(sequence_file)
-        if line.startswith('>'):
-            _pprint_fasta(itertools.chain([line], sequence_file),
-                          annotations=annotations,
-                          annotation_file=annotation_file,
+        with FastaFile(path) as fasta:
+            if not len(fasta):
+                raise ValueError('no records in FASTA file')
+            pager = Pager([(record.name, record) for record in fasta],
+                          annotations=annotations, beds=beds,
                           block_length=block_length,
                           blocks_per_line=blocks_per_line)
-        else:
-            _pprint_line(line.strip(), annotations=annotations,
-                         annotation_file=annotation_file,
-                         block_length=block_length,
-                         blocks_per_line=blocks_per_line)
-    except StopIteration:
-        pass
+            if region:
+                chrom, start, _ = region
+                pager.goto(chrom if start is None
+                           else '%s:%i' % (chrom, start + 1))
+            page(pager)
+    finally:
+        if spool is not None:
+            spool.close()
 
 
 def main():
@@ -132,14 +792,19 @@ def main():
     """
     parser = argparse.ArgumentParser(
         description='monoseq: pretty-printing DNA and protein sequences',
-        epilog='If INPUT is in FASTA format, each record is pretty-printed '
-        'after printing its name and ANNOTATION (if supplied) is used by '
-        'matching chromosome/record name. If INPUT contains a raw sequence, '
-        'only the first chromosome in ANNOTATION is used.')
+        epilog='If INPUT is in FASTA or FASTQ format, each record is '
+        'pretty-printed after printing its name and ANNOTATION (if supplied) '
+        'is used by matching chromosome/record name. If INPUT contains a raw '
+        'sequence, only the first chromosome in ANNOTATION is used. With '
+        'REGION, INPUT must be a FASTA file and only the selected region is '
+        'read from it.')
+    stdin = getattr(sys.stdin, 'buffer', sys.stdin)
+
     parser.add_argument(
-        'sequence_file', metavar='INPUT', nargs='?', default=sys.stdin,
-        type=argparse.FileType('r'), help='file to read sequence(s) from, '
-        'can be in FASTA format (default: standard input)')
+        'sequence_file', metavar='INPUT', nargs='?', default=stdin,
+        type=argparse.FileType('rb'), help='file to read sequence(s) from, '
+        'can be in FASTA or FASTQ format and compressed with gzip, bgzip, '
+        'bzip2, or xz (default: standard input)')
     parser.add_argument(
         '-b', '--block-length', metavar='LENGTH', dest='block_length',
         type=int, default=10, help='block length in letters (default: 10)')
@@ -151,15 +816,98 @@ def main():
         action='append', type=int, help='first and last positions of '
         'subsequence to annotate (allowed more than once)')
     parser.add_argument(
-        '-e', '--bed', metavar='ANNOTATION', dest='annotation_file',
-        type=argparse.FileType('r'), help='file to read annotation from in '
-        'BED format')
+        '-e', '--bed', metavar='ANNOTATION', dest='annotation_files',
+        action='append', type=argparse.FileType('rb'), help='file to read '
+        'annotation from in BED format, can be compressed (allowed more than '
+        'once, each file is a separate annotation level)')
+    parser.add_argument(
+        '--sorted', dest='sorted_annotations', action='store_true',
+        help='ANNOTATION files are sorted in the order of records in INPUT, '
+        'read them alongside INPUT to save memory')
+    parser.add_argument(
+        '-r', '--region', metavar='REGION', dest='region', type=_region,
+        help='only pretty-print REGION, given as CHROM, CHROM:START, or '
+        'CHROM:START-END (positions are one-based and inclusive)')
+    parser.add_argument(
+        '-j', '--jobs', metavar='JOBS', dest='jobs', type=int, default=1,
+        help='number of worker processes for pretty-printing FASTA records '
+        'in parallel (default: 1)')
+    parser.add_argument(
+        '--cache', metavar='DIRECTORY', dest='cache',
+        help='read pretty-printed sequences from DIRECTORY if they were '
+        'pretty-printed before with the same options, and store them there '
+        'otherwise')
+    parser.add_argument(
+        '--cache-size', metavar='MB', dest='cache_size', type=int,
+        default=1024, help='maximum size of the cache in megabytes, least '
+        'recently used entries are removed (default: 1024)')
+    parser.add_argument(
+        '--profile', dest='profile', action='store_true',
+        help='report time spent per stage, counts of processed items, and '
+        'peak memory use to standard error')
+    parser.add_argument(
+        '-q', '--quality', metavar='THRESHOLD', dest='quality_thresholds',
+        action='append', type=int, help='annotate bases in FASTQ reads with '
+        'a quality score below THRESHOLD (allowed more than once, each '
+        'threshold is a separate annotation level)')
+    parser.add_argument(
+        '--serve', metavar='SOCKET', dest='serve', nargs='?', const='-',
+        help='keep running and pretty-print requests given as JSON lines on '
+        'standard input, or on Unix socket SOCKET if given (see the '
+        'documentation for the request format)')
+    parser.add_argument(
+        '--pager', dest='pager', action='store_true',
+        help='show the output in an interactive pager that only '
+        'pretty-prints the visible lines (with REGION, start at its start)')
 
     args = parser.parse_args()
-    pprint(_until_eof(args.sequence_file), annotation=args.annotation,
-           annotation_file=args.annotation_file,
-           block_length=args.block_length,
-           blocks_per_line=args.blocks_per_line)
+
+    if args.region and args.sequence_file is stdin:
+        parser.error('reading a region requires INPUT to be a FASTA file')
+
+    stats = Stats() if args.profile else None
+
+    cache = None
+    if args.cache:
+        from .cache import Cache
+        cache = Cache(args.cache, max_size=args.cache_size * 1024 * 1024)
+
+    if args.serve:
+        if args.sequence_file is not stdin:
+            parser.error('INPUT cannot be used with --serve')
+        try:
+            _serve(args.serve, stdin, stats=stats)
+        except (IOError, OSError) as e:
+            parser.error(str(e))
+        return
+
+    if args.pager:
+        try:
+            _page(args.sequence_file, annotation=args.annotation,
+                  annotation_files=[
+                      decompressed(annotation_file)
+                      for annotation_file in args.annotation_files or []],
+                  block_length=args.block_length,
+                  blocks_per_line=args.blocks_per_line, region=args.region)
+        except (IOError, OSError, ValueError) as e:
+            parser.error(str(e))
+        return
+
+    try:
+        annotation_files = [decompressed(annotation_file)
+                            for annotation_file in args.annotation_files or []]
+        pprint(args.sequence_file, annotation=args.annotation,
+               annotation_files=annotation_files,
+               sorted_annotations=args.sorted_annotations,
+               block_length=args.block_length,
+               blocks_per_line=args.blocks_per_line, region=args.region,
+               jobs=args.jobs, stats=stats, cache=cache,
+               quality_thresholds=args.quality_thresholds)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if stats is not None:
+        sys.stderr.write(stats.report() + '\n')
 
 
 if __name__ == '__main__':
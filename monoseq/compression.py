@@ -0,0 +1,247 @@
+"""
+Reading compressed input for use with ``monoseq``.
+
+Files compressed with gzip, bzip2, and xz are detected and decompressed
+transparently. Files compressed with ``bgzip`` (using the BGZF format) can
+also be read at random positions, decompressing only the blocks needed.
+
+.. moduleauthor:: Martijn Vermaat <martijn@vermaat.name>
+
+.. Licensed under the MIT license, see the LICENSE.rst file.
+"""
+
+
+import bisect
+import collections
+import os
+import struct
+import zlib
+
+
+#: Compression formats as returned by :func:`compression`.
+GZIP, BGZF, BZIP2, XZ = 'gzip', 'bgzf', 'bzip2', 'xz'
+
+# Magic bytes at the start of files in each compression format.
+_GZIP_MAGIC = b'\x1f\x8b'
+_BGZF_MAGIC = b'\x1f\x8b\x08\x04'
+_BZIP2_MAGIC = b'BZh'
+_XZ_MAGIC = b'\xfd7zXZ\x00'
+
+
+def _peek(stream, size):
+    """
+    Return up to `size` bytes from the current position in `stream` without
+    consuming them.
+    """
+    if hasattr(stream, 'peek'):
+        return stream.peek(size)[:size]
+    try:
+        offset = stream.tell()
+    except (AttributeError, IOError, OSError, ValueError):
+        # We cannot look ahead without consuming data.
+        return b''
+    data = stream.read(size)
+    stream.seek(offset)
+    return data
+
+
+def compression(stream):
+    """
+    Detect the compression format of an open file in binary mode.
+
+    Nothing is consumed from the file. If it supports neither peeking (such
+    as standard input) nor seeking, it is assumed not to be compressed.
+
+    :return: One of :data:`GZIP`, :data:`BGZF`, :data:`BZIP2`, and
+        :data:`XZ`, or `None` if the file is not compressed.
+    :rtype: str
+    """
+    header = _peek(stream, 18)
+    if header.startswith(_BGZF_MAGIC) and header[12:14] == b'BC':
+        return BGZF
+    if header.startswith(_GZIP_MAGIC):
+        return GZIP
+    if header.startswith(_BZIP2_MAGIC):
+        return BZIP2
+    if header.startswith(_XZ_MAGIC):
+        return XZ
+    return None
+
+
+def decompressed(stream):
+    """
+    Decompressed version of an open file in binary mode.
+
+    :return: File object reading the decompressed data from `stream`, or
+        `stream` itself if it is not compressed.
+
+    A :exc:`ValueError` is raised if the compression format is not supported
+    by this Python installation.
+    """
+    # Modules for decompression are imported when needed, which saves some
+    # startup time for the command line interface.
+    format = compression(stream)
+    if format in (GZIP, BGZF):
+        import gzip
+        return gzip.GzipFile(fileobj=stream, mode='rb')
+    if format == BZIP2:
+        import bz2
+        try:
+            return bz2.BZ2File(stream)
+        except TypeError:
+            # On Python 2, BZ2File only opens files by name, so we
+            # decompress in memory.
+            import io
+            return io.BytesIO(bz2.decompress(stream.read()))
+    if format == XZ:
+        try:
+            import lzma
+        except ImportError:
+            raise ValueError('reading xz compressed files requires the lzma '
+                             'module')
+        return lzma.LZMAFile(stream)
+    return stream
+
+
+def read_gzi(index_file):
+    """
+    Read a BGZF block index from an open ``.gzi`` file (in binary mode), as
+    written by ``bgzip -i``.
+
+    :return: Tuples of (`compressed_offset`, `uncompressed_offset`) for the
+        start of each block.
+    :rtype: list(tuple)
+    """
+    count, = struct.unpack('<Q', index_file.read(8))
+    data = index_file.read(16 * count)
+    if len(data) != 16 * count:
+        raise ValueError('truncated BGZF index')
+    offsets = struct.unpack('<%iQ' % (2 * count), data)
+    # The first block is not included in the index.
+    return [(0, 0)] + list(zip(offsets[::2], offsets[1::2]))
+
+
+def build_gzi(bgzf_file):
+    """
+    Build a BGZF block index from an open BGZF file.
+
+    Only block headers and trailers are read, nothing is decompressed.
+
+    :return: Tuples of (`compressed_offset`, `uncompressed_offset`) for the
+        start of each block.
+    :rtype: list(tuple)
+    """
+    blocks = []
+    offset = uncompressed_offset = 0
+
+    while True:
+        bgzf_file.seek(offset)
+        header = bgzf_file.read(12)
+        if not header:
+            break
+        if len(header) < 12 or not header.startswith(_BGZF_MAGIC):
+            raise ValueError('not a BGZF file')
+
+        extra_length, = struct.unpack('<H', header[10:12])
+        extra = bgzf_file.read(extra_length)
+        block_size = None
+        i = 0
+        while i + 4 <= len(extra):
+            field_length, = struct.unpack('<H', extra[i + 2:i + 4])
+            if extra[i:i + 2] == b'BC' and field_length == 2:
+                block_size, = struct.unpack('<H', extra[i + 4:i + 6])
+                block_size += 1
+            i += 4 + field_length
+        if block_size is None:
+            raise ValueError('not a BGZF file')
+
+        # The uncompressed block size is in the last four bytes of the block.
+        bgzf_file.seek(offset + block_size - 4)
+        block_length, = struct.unpack('<I', bgzf_file.read(4))
+
+        blocks.append( (offset, uncompressed_offset) )
+        offset += block_size
+        uncompressed_offset += block_length
+
+    return blocks
+
+
+class BgzfFile(object):
+    """
+    BGZF compressed file, sliceable by positions in the uncompressed data.
+
+        >>> with BgzfFile('genome.fa.gz') as data:
+        ...     data[1000:1060]
+        b'ACGTCAGTCA...'
+
+    :arg path: Path to the BGZF file.
+    :type path: str
+    :arg cache_size: Maximum number of decompressed blocks to keep.
+    :type cache_size: int
+
+    The block index is read from ``<path>.gzi`` if it exists and is newer
+    than the BGZF file (such as written by ``bgzip -i``), otherwise it is
+    built by reading the header of each block. Slicing only decompresses the
+    blocks containing the slice, and the most recently used blocks are
+    cached.
+    """
+    def __init__(self, path, cache_size=16):
+        index_path = path + '.gzi'
+        self._file = open(path, 'rb')
+        if (os.path.exists(index_path) and
+            os.path.getmtime(index_path) >= os.path.getmtime(path)):
+            with open(index_path, 'rb') as index_file:
+                blocks = read_gzi(index_file)
+        else:
+            blocks = build_gzi(self._file)
+
+        self._offsets = [offset for offset, _ in blocks]
+        self._uncompressed_offsets = [offset for _, offset in blocks]
+        self._offsets.append(os.path.getsize(path))
+        self._cache = collections.OrderedDict()
+        self._cache_size = cache_size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getitem__(self, key):
+        start, stop = key.start or 0, key.stop
+        if start < 0 or stop is None or stop < 0 or key.step not in (None, 1):
+            raise ValueError('only slices with non-negative start and stop '
+                             'are supported')
+
+        parts = []
+        i = max(bisect.bisect_right(self._uncompressed_offsets, start) - 1, 0)
+        while i < len(self._uncompressed_offsets) and start < stop:
+            block_start = self._uncompressed_offsets[i]
+            block = self._block(i)
+            parts.append(block[start - block_start:stop - block_start])
+            start = block_start + len(block)
+            i += 1
+
+        return b''.join(parts)
+
+    def _block(self, i):
+        """
+        Decompressed data of block `i`.
+        """
+        block = self._cache.pop(i, None)
+        if block is None:
+            self._file.seek(self._offsets[i])
+            data = self._file.read(self._offsets[i + 1] - self._offsets[i])
+            # Blocks are complete gzip members, wbits=31 tells zlib to expect
+            # a gzip header and trailer.
+            block = zlib.decompress(data, 31)
+        self._cache[i] = block
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return block
+
+    def close(self):
+        """
+        Close the underlying file.
+        """
+        self._file.close()
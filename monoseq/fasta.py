@@ -0,0 +1,232 @@
+"""
+Random access to records in FASTA files for use with ``monoseq``.
+
+.. moduleauthor:: Martijn Vermaat <martijn@vermaat.name>
+
+.. Licensed under the MIT license, see the LICENSE.rst file.
+"""
+
+
+import collections
+import mmap
+import os
+
+from .compression import BGZF, BgzfFile, compression, decompressed
+
+
+class IndexEntry(collections.namedtuple(
+        'IndexEntry', ['name', 'length', 'offset', 'line_bases',
+                       'line_width'])):
+    """
+    Type of entries in a FASTA index, as in the ``.fai`` files written by
+    ``samtools faidx``.
+
+    :arg name: Record name (the header up to the first whitespace).
+    :type name: str
+    :arg length: Sequence length.
+    :type length: int
+    :arg offset: Offset in the file of the first base.
+    :type offset: int
+    :arg line_bases: Number of bases on each line.
+    :type line_bases: int
+    :arg line_width: Number of bytes on each line, including the line ending.
+    :type line_width: int
+    """
+    pass
+
+
+def read_index(index_file):
+    """
+    Read a FASTA index from an open ``.fai`` file.
+
+    :return: Index entries in file order.
+    :rtype: list(:class:`IndexEntry`)
+    """
+    entries = []
+    for line in index_file:
+        fields = line.split('\t')
+        if len(fields) < 5:
+            continue
+        entries.append(IndexEntry(fields[0], *(int(f) for f in fields[1:5])))
+    return entries
+
+
+def build_index(fasta_file):
+    """
+    Build a FASTA index from an open FASTA file (in binary mode).
+
+    :return: Index entries in file order.
+    :rtype: list(:class:`IndexEntry`)
+
+    As with ``samtools faidx``, all sequence lines in a record except the
+    last one must have the same length. A :exc:`ValueError` is raised if this
+    is not the case.
+    """
+    entries = []
+    record = None
+    offset = 0
+
+    for line in fasta_file:
+        offset += len(line)
+
+        if line.startswith(b'>'):
+            if record:
+                entries.append(IndexEntry(*record[:5]))
+            name = line[1:].split()
+            name = name[0].decode('utf-8') if name else ''
+            # Name, length, offset, line bases, line width, and whether we
+            # saw the last line.
+            record = [name, 0, offset, 0, 0, False]
+            continue
+
+        if record is None:
+            continue
+
+        bases = len(line.rstrip(b'\r\n'))
+        if not bases:
+            record[5] = True
+            continue
+        if record[5]:
+            raise ValueError('different line lengths in FASTA record: %s'
+                             % record[0])
+
+        if not record[3]:
+            record[3], record[4] = bases, len(line)
+        elif bases > record[3]:
+            raise ValueError('different line lengths in FASTA record: %s'
+                             % record[0])
+        record[1] += bases
+        record[5] = bases < record[3] or len(line) != record[4]
+
+    if record:
+        entries.append(IndexEntry(*record[:5]))
+
+    return entries
+
+
+class FastaRecord(object):
+    """
+    Sequence of a record in a memory-mapped FASTA file.
+
+    Slicing a record only reads the part of the file containing the slice, so
+    records can be passed to :func:`monoseq.pprint_sequence` directly.
+    """
+    def __init__(self, data, entry):
+        self._data = data
+        self._entry = entry
+        self.name = entry.name
+
+    def __len__(self):
+        return self._entry.length
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            if key < 0:
+                key += len(self)
+            if not 0 <= key < len(self):
+                raise IndexError('sequence index out of range')
+            return self[key:key + 1]
+
+        start, stop, step = key.indices(len(self))
+        if step != 1:
+            return self[start:stop:1][::step] if start < stop else ''
+        if start >= stop:
+            return ''
+
+        data = self._data[self._offset(start):self._offset(stop - 1) + 1]
+        return data.replace(b'\n', b'').replace(b'\r', b'').decode('ascii')
+
+    def __str__(self):
+        return self[:]
+
+    def __repr__(self):
+        return '<FastaRecord %s of length %i>' % (self.name, len(self))
+
+    def _offset(self, position):
+        """
+        Offset in the file of the base at `position`.
+        """
+        line, column = divmod(position, self._entry.line_bases)
+        return self._entry.offset + line * self._entry.line_width + column
+
+
+class FastaFile(object):
+    """
+    FASTA file with random access to its records.
+
+        >>> with FastaFile('genome.fa') as fasta:
+        ...     print pprint_sequence(fasta['chr7'], start=127471195,
+        ...                           stop=127472363)
+
+    :arg path: Path to the FASTA file.
+    :type path: str
+
+    The file is memory-mapped, so only the pages containing the requested
+    parts of records are read. Files compressed with ``bgzip`` are also
+    supported, in which case only the blocks containing the requested parts
+    are decompressed (see :class:`monoseq.compression.BgzfFile`). Other
+    compression formats do not allow random access and a :exc:`ValueError`
+    is raised for them. The index is read from ``<path>.fai`` if it
+    exists and is newer than the FASTA file (such as written by ``samtools
+    faidx``), otherwise it is built by reading through the file once.
+
+    Records can be looked up by name, and iterating over a :class:`FastaFile`
+    yields all records (as :class:`FastaRecord`) in file order.
+    """
+    def __init__(self, path):
+        with open(path, 'rb') as fasta_file:
+            format = compression(fasta_file)
+        if format not in (None, BGZF):
+            raise ValueError('random access to %s compressed FASTA files is '
+                             'not supported, use bgzip: %s' % (format, path))
+
+        index_path = path + '.fai'
+        if (os.path.exists(index_path) and
+            os.path.getmtime(index_path) >= os.path.getmtime(path)):
+            with open(index_path) as index_file:
+                entries = read_index(index_file)
+        else:
+            with open(path, 'rb') as fasta_file:
+                entries = build_index(decompressed(fasta_file))
+
+        if format == BGZF:
+            self._file = None
+            self._data = BgzfFile(path)
+        else:
+            self._file = open(path, 'rb')
+            try:
+                self._data = mmap.mmap(self._file.fileno(), 0,
+                                       access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be memory-mapped.
+                self._data = b''
+
+        self._records = collections.OrderedDict(
+            (entry.name, FastaRecord(self._data, entry)) for entry in entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __iter__(self):
+        return iter(self._records.values())
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, name):
+        return name in self._records
+
+    def __getitem__(self, name):
+        return self._records[name]
+
+    def close(self):
+        """
+        Close the underlying file.
+        """
+        if isinstance(self._data, (mmap.mmap, BgzfFile)):
+            self._data.close()
+        if self._file:
+            self._file.close()
@@ -0,0 +1,156 @@
+"""
+Reading reads from FASTQ files and annotating their base qualities for use
+with ``monoseq``.
+
+.. moduleauthor:: Martijn Vermaat <martijn@vermaat.name>
+
+.. Licensed under the MIT license, see the LICENSE.rst file.
+"""
+
+
+import re
+
+from .monoseq import _numpy, Regions
+
+
+#: Offset of the quality scores in FASTQ quality strings (Sanger and Illumina
+#: 1.8+ use Phred+33).
+PHRED_OFFSET = 33
+
+#: Number of reads for which runs of low-quality bases are found at once.
+BATCH_SIZE = 1024
+
+# Separator between joined quality strings, it is never a low quality.
+_SEPARATOR = b'\xff'
+
+# Runs of low-quality bases in quality strings translated with
+# :func:`_low_quality_table`.
+_LOW_QUALITY_RUN = re.compile(b'\x01+')
+
+
+def read_fastq(fastq):
+    """
+    Given an open FASTQ file in binary mode, yield tuples of (`header`,
+    `sequence`, `qualities`).
+
+    The `header` and `sequence` are strings, `qualities` is the quality
+    string as bytes. Records must have four lines each (sequences and quality
+    strings are not wrapped). A :exc:`ValueError` is raised for malformed
+    records.
+    """
+    lines = iter(fastq)
+    for header in lines:
+        if not header.strip():
+            continue
+        name = header[1:].strip().decode('ascii', 'replace')
+        if not header.startswith(b'@'):
+            raise ValueError('invalid FASTQ header: %s'
+                             % header.strip().decode('ascii', 'replace'))
+        try:
+            sequence = next(lines).strip()
+            separator = next(lines)
+            qualities = next(lines).strip()
+        except StopIteration:
+            raise ValueError('truncated FASTQ record: %s' % name)
+        if not separator.startswith(b'+'):
+            raise ValueError('invalid FASTQ record: %s' % name)
+        if len(qualities) != len(sequence):
+            raise ValueError('sequence and qualities differ in length in '
+                             'FASTQ record: %s' % name)
+        yield name, sequence.decode('ascii'), qualities
+
+
+def quality_levels(qualities, thresholds, offset=PHRED_OFFSET):
+    """
+    Annotation levels of low-quality bases for a batch of reads.
+
+        >>> quality_levels([b'II#I', b'##5I'], [10, 30])
+        [[<Regions with 1 regions>, <Regions with 1 regions>],
+         [<Regions with 1 regions>, <Regions with 1 regions>]]
+
+    :arg qualities: Quality strings of the reads, as in FASTQ files.
+    :type qualities: list(bytes)
+    :arg thresholds: For each threshold, bases with a quality score below it
+        are annotated in a separate level.
+    :type thresholds: list(int)
+    :arg offset: Offset of the quality scores in the quality strings.
+    :type offset: int
+
+    :return: For each read, its annotation levels (one per threshold).
+    :rtype: list(list(:class:`monoseq.Regions`))
+
+    The quality strings of all reads are scanned at once, with NumPy if it
+    is installed and otherwise with :meth:`bytes.translate` and a regular
+    expression. No Python code is run per base.
+    """
+    if not thresholds:
+        return [[] for _ in qualities]
+
+    # Quality strings are joined with a separator so runs cannot span two
+    # reads, and runs are then split by read.
+    data = _SEPARATOR.join(qualities)
+    read_starts = []
+    position = 0
+    for read_qualities in qualities:
+        read_starts.append(position)
+        position += len(read_qualities) + 1
+
+    numpy = _numpy()
+    levels = []
+    for threshold in thresholds:
+        if numpy is not None:
+            levels.append(_low_quality_runs_numpy(
+                numpy, data, read_starts, offset + threshold))
+        else:
+            levels.append(_low_quality_runs_scan(
+                data, read_starts, offset + threshold))
+    return [list(read_levels) for read_levels in zip(*levels)]
+
+
+def _low_quality_runs_numpy(numpy, data, read_starts, minimum):
+    """
+    For each read starting at a position in `read_starts` in `data`, the
+    runs of quality scores (as bytes) below `minimum`, using NumPy.
+    """
+    mask = numpy.frombuffer(data, dtype=numpy.uint8) < minimum
+    edges = numpy.diff(numpy.concatenate(
+        ([False], mask, [False])).astype(numpy.int8))
+    starts = numpy.flatnonzero(edges == 1)
+    stops = numpy.flatnonzero(edges == -1)
+
+    read_starts = numpy.asarray(read_starts, dtype=numpy.int64)
+    reads = numpy.searchsorted(read_starts, starts, side='right') - 1
+    starts -= read_starts[reads]
+    stops -= read_starts[reads]
+    bounds = numpy.searchsorted(reads, numpy.arange(len(read_starts) + 1))
+
+    # Reads have few runs, for which partitioning is faster without NumPy.
+    starts, stops, bounds = starts.tolist(), stops.tolist(), bounds.tolist()
+    return [Regions(starts[first:last], stops[first:last])
+            for first, last in zip(bounds[:-1], bounds[1:])]
+
+
+def _low_quality_runs_scan(data, read_starts, minimum):
+    """
+    For each read starting at a position in `read_starts` in `data`, the
+    runs of quality scores (as bytes) below `minimum`, using a regular
+    expression.
+    """
+    runs = [[] for _ in read_starts]
+    read = 0
+    for match in _LOW_QUALITY_RUN.finditer(
+            data.translate(_low_quality_table(minimum))):
+        start, stop = match.span()
+        while read + 1 < len(read_starts) and read_starts[read + 1] <= start:
+            read += 1
+        runs[read].append( (start - read_starts[read],
+                            stop - read_starts[read]) )
+    return [Regions.from_pairs(read_runs) for read_runs in runs]
+
+
+def _low_quality_table(minimum):
+    """
+    Translation table for :meth:`bytes.translate` mapping quality scores
+    below `minimum` to ``\\x01`` and others to ``\\x00``.
+    """
+    return bytes(bytearray(1 if i < minimum else 0 for i in range(256)))
@@ -8,11 +8,13 @@ Convenience wrapper around ``monoseq`` for use in the IPython Notebook.
 
 
 import binascii
+import bisect
+import collections
+import math
 import os
 
-from IPython.display import HTML
-
-from .monoseq import HtmlFormat, pprint_sequence
+from .monoseq import (_annotation_regions, _iter_lines, HtmlFormat,
+                      partition_range, Renderer)
 
 
 #: Default CSS for styling in the IPython Notebook, suporting up to four
@@ -48,28 +50,271 @@ DEFAULT_STYLE = """
 """
 
 
-def Seq(sequence, annotations=None, block_length=10, blocks_per_line=6,
-        style=DEFAULT_STYLE):
+#: Maximum number of renderings kept in the cache used by :class:`Seq`.
+CACHE_SIZE = 16
+
+# Cached renderings by (`sequence`, `block_length`, `blocks_per_line`,
+# `style`), least recently used first.
+_cache = collections.OrderedDict()
+
+# Types of sequences for which renderings are cached. They cannot change, so
+# the sequence itself can be part of the cache key.
+_IMMUTABLE_TYPES = str, bytes, type(u'')
+
+
+class Seq(object):
     """
     Pretty-printed sequence object that's displayed nicely in the IPython
     Notebook.
 
+        >>> seq = Seq(sequence, annotations=[exons, snps])
+        >>> seq
+        >>> seq.annotations = [exons]
+        >>> seq
+
     :arg style: Custom CSS as a `format string`, where a selector for the
         top-level ``<pre>`` element is substituted for `{selector}`. See
         :data:`DEFAULT_STYLE` for an example.
     :type style: str
+    :arg page_lines: Number of lines per page. If `None`, the entire sequence
+        is displayed.
+    :type page_lines: int
+    :arg page: Page to display, starting at 0.
+    :type page: int
 
     For a description of the other arguments, see
     :func:`monoseq.pprint_sequence`.
+
+    Lines are rendered as they are displayed and cached for the last
+    :data:`CACHE_SIZE` combinations of sequence and layout. If a :class:`Seq`
+    is displayed with different annotations than a cached rendering of the
+    same sequence (either by changing its `annotations` attribute or by
+    creating a new :class:`Seq` for an equal sequence), only the lines
+    touching changed annotation regions are rendered again. Renderings are
+    only cached for sequences that are strings, other sequences (such as
+    NumPy arrays) can be modified and are rendered again every time.
+
+    For very large sequences, use `page_lines` to display one page of lines
+    at a time. Only the lines on the page are rendered, so the cost of
+    displaying a page does not depend on the length of the sequence. Use
+    :meth:`goto` or :meth:`browse` to display other pages.
+    """
+    def __init__(self, sequence, annotations=None, block_length=10,
+                 blocks_per_line=6, style=DEFAULT_STYLE, page_lines=None,
+                 page=0):
+        self.sequence = sequence
+        self.annotations = annotations
+        self.block_length = block_length
+        self.blocks_per_line = blocks_per_line
+        self.style = style
+        self.page_lines = page_lines
+        self.page = page
+
+    @property
+    def page_count(self):
+        """
+        Number of pages.
+        """
+        if self.page_lines is None:
+            return 1
+        lines = _line_count(len(self.sequence),
+                            self.block_length * self.blocks_per_line)
+        return (lines - 1) // self.page_lines + 1
+
+    def goto(self, page):
+        """
+        Go to page `page`, starting at 0. Negative values count from the last
+        page.
+
+        :return: This object, so ``seq.goto(2)`` in a notebook cell displays
+            the page.
+        :rtype: :class:`Seq`
+        """
+        if page < 0:
+            page += self.page_count
+        if not 0 <= page < self.page_count:
+            raise IndexError('page out of range')
+        self.page = page
+        return self
+
+    def browse(self):
+        """
+        Widget displaying one page at a time, with buttons to go to the
+        previous and next page. Pages are rendered by the kernel as they are
+        requested.
+
+        This requires the `ipywidgets` package.
+
+        :rtype: :class:`ipywidgets.VBox`
+        """
+        import ipywidgets
+
+        output = ipywidgets.HTML(self._repr_html_())
+        previous = ipywidgets.Button(description='Previous')
+        next = ipywidgets.Button(description='Next')
+
+        def go(offset):
+            def handler(button):
+                page = self.page + offset
+                if 0 <= page < self.page_count:
+                    output.value = self.goto(page)._repr_html_()
+            return handler
+
+        previous.on_click(go(-1))
+        next.on_click(go(1))
+        return ipywidgets.VBox([ipywidgets.HBox([previous, next]), output])
+
+    def _repr_html_(self):
+        rendering = _rendering(self.sequence, self.block_length,
+                               self.blocks_per_line, self.style)
+        if self.page_lines is None:
+            return rendering.html(self.annotations)
+
+        first = self.page * self.page_lines
+        html = rendering.html(self.annotations, first,
+                              first + self.page_lines)
+        line_length = self.block_length * self.blocks_per_line
+        return html + ('<p>Page {page} of {pages} (positions {start} to '
+                       '{stop} of {length}).</p>'.format(
+                           page=self.page + 1,
+                           pages=self.page_count,
+                           start=min(first * line_length + 1,
+                                     len(self.sequence)),
+                           stop=min((first + self.page_lines) * line_length,
+                                    len(self.sequence)),
+                           length=len(self.sequence)))
+
+    def __repr__(self):
+        return '<Seq of length %i>' % len(self.sequence)
+
+
+def _line_count(length, line_length):
+    """
+    Number of pretty-printed lines for a sequence of length `length`.
+    """
+    # An empty sequence still gets one line with only the margin.
+    return max((length - 1) // line_length + 1, 1)
+
+
+def _rendering(sequence, block_length, blocks_per_line, style):
+    """
+    Get the cached rendering for the given arguments, creating it if needed.
+    Renderings of sequences that are not strings are not cached.
+    """
+    if not isinstance(sequence, _IMMUTABLE_TYPES):
+        return _Rendering(sequence, block_length, blocks_per_line, style)
+
+    key = sequence, block_length, blocks_per_line, style
+    rendering = _cache.pop(key, None)
+    if rendering is None:
+        rendering = _Rendering(sequence, block_length, blocks_per_line,
+                               style)
+
+    _cache[key] = rendering
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+
+    return rendering
+
+
+class _Rendering(object):
+    """
+    Rendered HTML lines of a sequence for its last seen annotations. Lines
+    are rendered when they are first requested.
+    """
+    def __init__(self, sequence, block_length, blocks_per_line, style):
+        self.sequence = sequence
+        self.block_length = block_length
+        self.blocks_per_line = blocks_per_line
+        self.line_length = block_length * blocks_per_line
+
+        seq_id = 'monoseq-' + binascii.hexlify(os.urandom(4)).decode('ascii')
+        self.prefix = ('<style>{style}</style><pre id="{seq_id}">'
+                       .format(style=style.format(selector='#' + seq_id),
+                               seq_id=seq_id))
+
+        self.renderer = Renderer(HtmlFormat)
+        self.margin = int(math.floor(math.log(max(len(sequence), 1), 10))
+                          + 1) + len(HtmlFormat.margin[0])
+        self.annotations = None
+        self.partitioning = None
+        self.part_starts = None
+
+        # Rendered lines, `None` for lines not rendered yet.
+        self.lines = [None] * _line_count(len(sequence), self.line_length)
+
+    def html(self, annotations, first=0, last=None):
+        """
+        HTML for lines `first` to `last` (not included) of the sequence with
+        `annotations`.
+        """
+        self.update(annotations)
+        first = min(first, len(self.lines))
+        last = len(self.lines) if last is None else min(last, len(self.lines))
+
+        for run_start, run_stop in _runs(i for i in range(first, last)
+                                         if self.lines[i] is None):
+            self.lines[run_start:run_stop] = self._render(
+                run_start * self.line_length,
+                min(run_stop * self.line_length, len(self.sequence)))
+
+        return self.prefix + '\n'.join(self.lines[first:last]) + '</pre>'
+
+    def update(self, annotations):
+        """
+        Forget rendered lines touching regions that differ between the last
+        seen annotations and `annotations`.
+        """
+        annotations = [set(regions) for regions
+                       in _annotation_regions(annotations)]
+        if annotations == self.annotations:
+            return
+
+        self.partitioning = partition_range(len(self.sequence), annotations,
+                                            bitmask=True)
+        self.part_starts = [start for start, _, _ in self.partitioning]
+
+        if self.annotations is not None:
+            levels = max(len(annotations), len(self.annotations))
+            for level in range(levels):
+                old = (self.annotations[level]
+                       if level < len(self.annotations) else set())
+                new = (annotations[level]
+                       if level < len(annotations) else set())
+                for start, stop in old ^ new:
+                    start = max(start, 0)
+                    stop = min(stop, len(self.sequence))
+                    if start < stop:
+                        i = start // self.line_length
+                        j = (stop - 1) // self.line_length + 1
+                        self.lines[i:j] = [None] * (j - i)
+
+        self.annotations = annotations
+
+    def _render(self, start, stop):
+        """
+        Render the lines for the region from `start` to `stop`.
+        """
+        # Only pass the parts overlapping the region, so the cursor in
+        # _iter_lines need not walk the partitioning from the start.
+        i = max(bisect.bisect_right(self.part_starts, start) - 1, 0)
+        j = bisect.bisect_left(self.part_starts, stop)
+        return list(_iter_lines(self.sequence, self.partitioning[i:j], start,
+                                stop, self.margin, self.block_length,
+                                self.blocks_per_line, self.renderer))
+
+
+def _runs(indices):
+    """
+    Yield tuples (`start`, `stop`) of runs of consecutive values in sorted
+    `indices`.
     """
-    seq_id = 'monoseq-' + binascii.hexlify(os.urandom(4))
-    pprinted = pprint_sequence(sequence,
-                               annotations=annotations,
-                               block_length=block_length,
-                               blocks_per_line=blocks_per_line,
-                               format=HtmlFormat)
-
-    return HTML('<style>{style}</style><pre id="{seq_id}">{pprinted}</pre>'
-                .format(style=style.format(selector='#' + seq_id),
-                        seq_id=seq_id,
-                        pprinted=pprinted))
+    run_start = run_stop = None
+    for index in indices:
+        if index != run_stop:
+            if run_start is not None:
+                yield run_start, run_stop
+            run_start = index
+        run_stop = index + 1
+    if run_start is not None:
+        yield run_start, run_stop
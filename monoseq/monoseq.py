@@ -8,10 +8,17 @@ using a monospace font.
 """
 
 
+import array
 import collections
+import heapq
 import itertools
 import math
 
+try:
+    from itertools import izip as zip
+except ImportError:
+    pass
+
 
 class Format(collections.namedtuple('Format', ['annotations', 'margin'])):
     """
@@ -47,7 +54,198 @@ HtmlFormat = Format([('<span class="monoseq-annotation-%i">' % i, '</span>')
                     ('<span class="monoseq-margin">', '</span>'))
 
 
-def partition_range(stop, annotations=None):
+#: Minimum number of annotation regions for which :func:`partition_range`
+#: uses NumPy (if it is installed).
+NUMPY_MIN_REGIONS = 1000
+
+
+_numpy_module = None
+
+# Types of strings, on Python 2 sequences can also be unicode strings.
+_STRING_TYPES = str, type(u'')
+
+
+def _numpy():
+    """
+    Return the NumPy module, or `None` if NumPy is not installed.
+
+    NumPy is optional and only imported when it is first needed.
+    """
+    global _numpy_module
+    if _numpy_module is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy_module = numpy
+    return _numpy_module or None
+
+
+class Renderer(object):
+    """
+    Output format prepared for pretty-printing many sequences.
+
+        >>> renderer = Renderer(HtmlFormat)
+        >>> for sequence in sequences:
+        ...     print pprint_sequence(sequence, format=renderer)
+
+    :arg format: Output format to use for pretty-printing.
+    :type format: :class:`Format`
+    :arg cache_size: Maximum number of combinations of annotation levels to
+        cache delimiters for.
+    :type cache_size: int
+
+    The delimiters enclosing a subsequence only depend on its combination of
+    annotation levels. A renderer computes them once for each combination and
+    keeps them for the `cache_size` most recently used combinations. It can
+    be passed instead of a :class:`Format` to :func:`pprint_sequence` and
+    :func:`iter_pprint_sequence`.
+    """
+    def __init__(self, format, cache_size=1024):
+        self.format = format
+        self.cache_size = cache_size
+        # Levels not supported by the format are ignored.
+        self._supported = (1 << len(format.annotations)) - 1
+        self._cache = collections.OrderedDict()
+
+    def delimiters(self, levels):
+        """
+        Delimiters for enclosing a subsequence with the given annotation
+        levels.
+
+        :arg levels: Annotation levels as a bitmask (where bit `i` is set for
+            level `i`).
+        :type levels: int
+
+        :return: Pair (`left`, `right`) of delimiters.
+        :rtype: tuple
+        """
+        levels &= self._supported
+        try:
+            result = self._cache[levels]
+        except KeyError:
+            pass
+        else:
+            # The least recently used combination is kept first.
+            _move_to_end(self._cache, levels)
+            return result
+
+        delimiters = [(left, right) for level, (left, right)
+                      in enumerate(self.format.annotations)
+                      if levels >> level & 1]
+        result = (''.join(left for left, right in reversed(delimiters)),
+                  ''.join(right for left, right in delimiters))
+
+        if self._cache and len(self._cache) >= self.cache_size:
+            self._cache.popitem(last=False)
+        self._cache[levels] = result
+        return result
+
+
+def _move_to_end(ordered, key):
+    """
+    Move `key` to the end of the ordered dictionary `ordered`.
+    """
+    try:
+        ordered.move_to_end(key)
+    except AttributeError:
+        # Python 2 has no OrderedDict.move_to_end.
+        ordered[key] = ordered.pop(key)
+
+
+class Regions(object):
+    """
+    Compact representation of the regions in one annotation level.
+
+        >>> regions = Regions([0, 30], [21, 35])
+        >>> list(regions)
+        [(0, 21), (30, 35)]
+
+    :arg starts: Start positions of the regions.
+    :type starts: iterable(int)
+    :arg stops: Stop positions (not included) of the regions.
+    :type stops: iterable(int)
+
+    Positions are stored in :class:`array.array` objects, unless they are
+    given as arrays already (this includes NumPy arrays). This takes a small
+    fraction of the memory needed for a list of (`start`, `stop`) tuples.
+
+    Iterating over a :class:`Regions` object yields (`start`, `stop`) tuples,
+    so it can be used anywhere a list of regions is expected.
+    """
+    def __init__(self, starts, stops):
+        self.starts = _positions_array(starts)
+        self.stops = _positions_array(stops)
+        if len(self.starts) != len(self.stops):
+            raise ValueError('number of start and stop positions differ')
+
+    @classmethod
+    def from_pairs(cls, regions):
+        """
+        Create a :class:`Regions` object from (`start`, `stop`) tuples.
+        """
+        starts, stops = array.array('l'), array.array('l')
+        for start, stop in regions:
+            starts.append(start)
+            stops.append(stop)
+        return cls(starts, stops)
+
+    @classmethod
+    def from_mask(cls, mask):
+        """
+        Create a :class:`Regions` object from the runs of true values in
+        `mask`, which has a boolean value for each position (e.g., a NumPy
+        boolean array).
+        """
+        numpy = _numpy()
+        if numpy is not None:
+            mask = numpy.asarray(mask, dtype=bool)
+            edges = numpy.diff(numpy.concatenate(
+                ([False], mask, [False])).astype(numpy.int8))
+            return cls(numpy.flatnonzero(edges == 1),
+                       numpy.flatnonzero(edges == -1))
+
+        starts, stops = array.array('l'), array.array('l')
+        position = 0
+        for value, run in itertools.groupby(mask, bool):
+            length = sum(1 for _ in run)
+            if value:
+                starts.append(position)
+                stops.append(position + length)
+            position += length
+        return cls(starts, stops)
+
+    def __iter__(self):
+        return iter(zip(self.starts, self.stops))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __repr__(self):
+        return '<Regions with %i regions>' % len(self)
+
+
+def _positions_array(positions):
+    """
+    Return `positions` as an array, unless it already is one.
+    """
+    if isinstance(positions, array.array) or hasattr(positions, 'dtype'):
+        return positions
+    return array.array('l', positions)
+
+
+def _level_events(regions, level):
+    """
+    Yield the start and stop events for the regions in an annotation level as
+    (`position`, `level`, `delta`) tuples, sorted by position.
+    """
+    starts = sorted(x for x, y in regions if x < y)
+    stops = sorted(y for x, y in regions if x < y)
+    return heapq.merge(((p, level, 1) for p in starts),
+                       ((p, level, -1) for p in stops))
+
+
+def partition_range(stop, annotations=None, bitmask=False):
     """
     Partition the range from 0 to `stop` based on annotations.
 
@@ -66,8 +264,12 @@ def partition_range(stop, annotations=None):
         argument of the built-in :func:`range` function).
     :type stop: int
     :arg annotations: For each annotation level, a list of (`start`, `stop`)
-        pairs defining an annotated region.
+        pairs or a :class:`Regions` object defining the annotated regions,
+        or a NumPy boolean array with a value for each position.
     :type annotations: list
+    :arg bitmask: Represent the annotation levels for each part by an integer
+        bitmask (where bit `i` is set for level `i`) instead of a set.
+    :type bitmask: bool
 
     :return: Partitioning of the range as (`start`, `stop`, `levels`) tuples
         defining a region with a set of annotation levels.
@@ -82,25 +284,69 @@ def partition_range(stop, annotations=None):
 
     Annotation regions can overlap (overlap within one level is ignored) and
     do not need to be sorted.
+
+    If NumPy is installed and there are at least :data:`NUMPY_MIN_REGIONS`
+    annotation regions, the partitioning is computed with NumPy.
     """
-    annotations = annotations or []
+    annotations = _annotation_regions(annotations)
+
+    numpy = None
+    if (stop > 0 and len(annotations) < 63 and
+        sum(len(regions) for regions in annotations) >= NUMPY_MIN_REGIONS):
+        numpy = _numpy()
+
+    if numpy is not None:
+        partitioning = _partition_range_numpy(numpy, stop, annotations)
+    else:
+        partitioning = _partition_range_sweep(stop, annotations)
+
+    if bitmask:
+        return partitioning
+
+    return [(start, stop, _levels_set(levels))
+            for start, stop, levels in partitioning]
+
+
+def _annotation_regions(annotations):
+    """
+    Return `annotations` as a list where NumPy boolean arrays are replaced by
+    :class:`Regions` objects.
+    """
+    return [Regions.from_mask(regions)
+            if getattr(regions, 'dtype', None) == bool else regions
+            for regions in annotations or []]
+
+
+def _partition_range_sweep(stop, annotations):
+    """
+    Partition the range from 0 to `stop` based on annotations, with levels as
+    bitmasks, in pure Python.
+    """
+    # Region start and stop events as (`position`, `level`, `delta`) tuples,
+    # sorted by position. Sweeping over them while keeping a count of active
+    # regions per level gives us the levels at each position without
+    # rescanning all regions.
+    events = heapq.merge(*[_level_events(regions, level)
+                           for level, regions in enumerate(annotations)])
+    counts = [0] * len(annotations)
+    levels = 0
 
     partitioning = []
-    part_start, part_levels = 0, None
+    part_start, part_levels = 0, 0
 
     # We loop over the range, only touching positions where levels potentially
     # change.
-    for p in sorted(set(itertools.chain([0, stop],
-                                        *itertools.chain(*annotations)))):
-        if p == stop:
-            partitioning.append( (part_start, p, part_levels) )
+    for p, p_events in itertools.groupby(events, lambda event: event[0]):
+        if p >= stop:
             break
 
         # Annotation levels for position p.
-        levels = {level for level, regions in enumerate(annotations)
-                  if any(x <= p < y for x, y in regions)}
+        for _, level, delta in p_events:
+            counts[level] += delta
+            if counts[level] == (delta > 0):
+                levels ^= 1 << level
 
-        if p == 0:
+        if p <= 0:
             part_levels = levels
             continue
 
@@ -108,11 +354,78 @@ def partition_range(stop, annotations=None):
             partitioning.append( (part_start, p, part_levels) )
             part_start, part_levels = p, levels
 
+    partitioning.append( (part_start, stop, part_levels) )
+
     return partitioning
 
 
+def _partition_range_numpy(numpy, stop, annotations):
+    """
+    Partition the range from 0 to `stop` based on annotations, with levels as
+    bitmasks, using NumPy.
+    """
+    # Region start and stop events, with positions clipped to the range.
+    positions, deltas, event_levels = [], [], []
+    for level, regions in enumerate(annotations):
+        if isinstance(regions, Regions):
+            starts = numpy.asarray(regions.starts, dtype=numpy.int64)
+            stops = numpy.asarray(regions.stops, dtype=numpy.int64)
+        else:
+            pairs = numpy.array(list(regions), dtype=numpy.int64)
+            starts, stops = pairs.reshape(-1, 2).T
+        nonempty = starts < stops
+        for bounds, delta in ((starts, 1), (stops, -1)):
+            positions.append(numpy.clip(bounds[nonempty], 0, stop))
+            deltas.append(numpy.full(len(positions[-1]), delta,
+                                     dtype=numpy.int64))
+            event_levels.append(numpy.full(len(positions[-1]), level,
+                                           dtype=numpy.int64))
+
+    positions = numpy.concatenate([[0]] + positions).astype(numpy.int64)
+    deltas = numpy.concatenate([[0]] + deltas).astype(numpy.int64)
+    event_levels = numpy.concatenate([[-1]] + event_levels)
+
+    order = numpy.argsort(positions, kind='mergesort')
+    positions = positions[order]
+    deltas = deltas[order]
+    event_levels = event_levels[order]
+
+    # Breakpoints are the distinct event positions in the range, the levels
+    # at a breakpoint are determined by the last event at that position.
+    last = numpy.append(numpy.flatnonzero(positions[1:] != positions[:-1]),
+                        len(positions) - 1)
+    last = last[positions[last] < stop]
+    breakpoints = positions[last]
+
+    # For each level, the number of active regions after each event is the
+    # cumulative sum of region starts minus region stops.
+    levels = numpy.zeros(len(last), dtype=numpy.int64)
+    for level in range(len(annotations)):
+        counts = numpy.cumsum(numpy.where(event_levels == level, deltas, 0))
+        levels |= (counts[last] > 0).astype(numpy.int64) << level
+
+    # Parts start at the first breakpoint and wherever the levels change.
+    changes = numpy.concatenate(
+        [[0], numpy.flatnonzero(numpy.diff(levels)) + 1])
+    part_starts = breakpoints[changes]
+    part_stops = numpy.append(part_starts[1:], stop)
+
+    return list(zip(part_starts.tolist(), part_stops.tolist(),
+                    levels[changes].tolist()))
+
+
+def _levels_set(levels):
+    """
+    Convert a bitmask of annotation levels to a set.
+    """
+    return {level for level in range(levels.bit_length())
+            if levels >> level & 1}
+
+
 def pprint_sequence(sequence, annotations=None, block_length=10,
-                    blocks_per_line=6, format=PlaintextFormat):
+                    blocks_per_line=6, format=PlaintextFormat, start=None,
+                    stop=None, workers=1, chunk_lines=1000, stats=None,
+                    cache=None):
     """
     Pretty-print sequence for use with a monospace font.
 
@@ -127,7 +440,8 @@ def pprint_sequence(sequence, annotations=None, block_length=10,
     :type sequence: str or any sliceable yielding slices representable as
         strings.
     :arg annotations: For each annotation level, a list of (`start`, `stop`)
-        pairs defining an annotated region.
+        pairs or a :class:`Regions` object defining the annotated regions,
+        or a NumPy boolean array with a value for each position.
     :type annotations: list
     :arg block_length: Length of space-separated blocks.
     :type block_length: int
@@ -135,8 +449,29 @@ def pprint_sequence(sequence, annotations=None, block_length=10,
     :type blocks_per_line: int
     :arg format: Output format to use for pretty-printing. Some formats are
         pre-defined as :data:`HtmlFormat`, :data:`AnsiFormat`, and
-        :data:`PlaintextFormat`.
-    :type format: :class:`Format`
+        :data:`PlaintextFormat`. Use a :class:`Renderer` when pretty-printing
+        many sequences in the same format.
+    :type format: :class:`Format` or :class:`Renderer`
+    :arg start: Start of the region of `sequence` to pretty-print (default:
+        the start of `sequence`).
+    :type start: int
+    :arg stop: End (not included) of the region of `sequence` to
+        pretty-print (default: the end of `sequence`).
+    :type stop: int
+    :arg workers: Number of worker processes to use. With 1 worker,
+        everything is done in the current process. If `None`, the number of
+        CPUs is used.
+    :type workers: int
+    :arg chunk_lines: Number of lines to pretty-print in a worker process at
+        once.
+    :type chunk_lines: int
+    :arg stats: If given, timings of the ``partition`` and ``render`` stages
+        and counts of ``regions``, ``partitions``, and ``lines`` are added to
+        it.
+    :type stats: :class:`monoseq.stats.Stats`
+    :arg cache: If given, the result is read from this cache if possible and
+        stored in it otherwise.
+    :type cache: :class:`monoseq.cache.Cache`
 
     :return: Pretty-printed version of `sequence`.
     :rtype: str
@@ -151,39 +486,490 @@ def pprint_sequence(sequence, annotations=None, block_length=10,
     Annotation regions can overlap (overlap within one level is ignored) and
     do not need to be sorted.
 
+    If a region is selected with `start` and `stop`, lines start at `start`
+    and the margin shows positions in the complete sequence. Only this region
+    of `sequence` is ever sliced, so `sequence` can be an object that reads
+    its data lazily (e.g., a :class:`monoseq.fasta.FastaRecord`).
+
+    With more than 1 worker, the sequence is split in chunks of `chunk_lines`
+    lines that are pretty-printed in parallel. Each chunk is sliced from
+    `sequence` before it is sent to a worker process, so these slices must be
+    picklable.
+
     The number of annotation levels supported depends on `format`.
     :data:`HtmlFormat` supports 10 levels, :data:`AnsiFormat` supports 3
     levels and annotations are ignored completely with
     :data:`PlaintextFormat`.
     """
+    return '\n'.join(iter_pprint_sequence(sequence,
+                                          annotations=annotations,
+                                          block_length=block_length,
+                                          blocks_per_line=blocks_per_line,
+                                          format=format, start=start,
+                                          stop=stop, workers=workers,
+                                          chunk_lines=chunk_lines,
+                                          stats=stats, cache=cache))
+
+
+def iter_pprint_sequence(sequence, annotations=None, block_length=10,
+                         blocks_per_line=6, format=PlaintextFormat, start=None,
+                         stop=None, workers=1, chunk_lines=1000, stats=None,
+                         cache=None):
+    """
+    Pretty-print sequence for use with a monospace font, one line at a time.
+
+        >>> sequence = 'MIMANQPLWLDSEVEMNHYQQSHIKSKSPYFPEDKHICWIKIFKAFGT' * 4
+        >>> for line in iter_pprint_sequence(sequence):
+        ...     print line
+          1  MIMANQPLWL DSEVEMNHYQ QSHIKSKSPY FPEDKHICWI KIFKAFGTMI MANQPLWLDS
+         61  EVEMNHYQQS HIKSKSPYFP EDKHICWIKI FKAFGTMIMA NQPLWLDSEV EMNHYQQSHI
+        121  KSKSPYFPED KHICWIKIFK AFGTMIMANQ PLWLDSEVEM NHYQQSHIKS KSPYFPEDKH
+        181  ICWIKIFKAF GT
+
+    :return: Iterator over the lines (without line endings) of the
+        pretty-printed version of `sequence`.
+    :rtype: iterator(str)
+
+    Only one line of output (or with more than one worker, a few chunks of
+    lines) is kept in memory at any time. For a description of the
+    arguments, see :func:`pprint_sequence`. With a `cache`, lines are only
+    stored in it if all of them are consumed.
+    """
+    if cache is not None:
+        key = cache.key(sequence, annotations=annotations,
+                        block_length=block_length,
+                        blocks_per_line=blocks_per_line, format=format,
+                        start=start, stop=stop)
+        lines = cache.lines(key)
+        if lines is not None:
+            if stats is not None:
+                lines = stats.timed(lines, 'read cache', 'lines')
+            for line in lines:
+                yield line
+            return
+
+    if workers is None:
+        workers = _cpu_count()
+
+    renderer, region_start, region_stop, partitioning, margin = _prepare(
+        sequence, annotations, format, start, stop, stats=stats)
+
+    if workers <= 1 or region_start == region_stop:
+        lines = _iter_lines(sequence, partitioning, region_start, region_stop,
+                            margin, block_length, blocks_per_line, renderer)
+    else:
+        tasks = _chunk_tasks(sequence, partitioning, region_start,
+                             region_stop, margin, block_length,
+                             blocks_per_line, renderer, chunk_lines)
+        lines = itertools.chain.from_iterable(
+            _parallel_map(_pprint_lines, tasks, workers))
+
+    if cache is not None:
+        lines = cache.store(key, lines)
+
+    if stats is not None:
+        lines = stats.timed(lines, 'render', 'lines')
+
+    for line in lines:
+        yield line
+
+
+def _prepare(sequence, annotations, format, start, stop, stats=None):
+    """
+    Prepare pretty-printing the region from `start` to `stop` of `sequence`.
+    If `stats` is given, partitioning is timed and counted.
+
+    :return: Tuple of (`renderer`, `start`, `stop`, `partitioning`,
+        `margin`) where `start` and `stop` are normalized, `partitioning` is
+        the partitioning of the region with levels as bitmasks, and `margin`
+        is the width of the margin.
+    """
     annotations = annotations or []
 
-    partitioning = partition_range(len(sequence), annotations)
+    if isinstance(format, Renderer):
+        renderer = format
+    else:
+        renderer = Renderer(format)
+
+    region_start, region_stop, _ = slice(start, stop).indices(len(sequence))
+    region_stop = max(region_start, region_stop)
+
+    # Annotations are not shown at all if the format has no delimiters for
+    # them, and the partitioning can be skipped.
+    if not renderer.format.annotations:
+        annotations = []
+
+    # Only annotation regions overlapping the selected region are relevant.
+    if (region_start, region_stop) != (0, len(sequence)):
+        annotations = _annotation_regions(annotations)
+        annotations = [[(max(x, region_start), min(y, region_stop))
+                        for x, y in regions
+                        if x < region_stop and y > region_start]
+                       for regions in annotations]
+
+    if stats is None:
+        partitioning = partition_range(region_stop, annotations,
+                                       bitmask=True)
+    else:
+        with stats.stage('partition'):
+            annotations = _annotation_regions(annotations)
+            partitioning = partition_range(region_stop, annotations,
+                                           bitmask=True)
+        stats.add_count('regions', sum(len(regions)
+                                       for regions in annotations))
+        stats.add_count('partitions', len(partitioning))
 
     # The maximum length for positions is the 10_log of the length of the
     # sequence.
     margin = int(math.floor(math.log(max(len(sequence), 1), 10))
-                 + 1) + len(format.margin[0])
-    result = (format.margin[0] + '1').rjust(margin) + format.margin[1] + ' '
-
-    for p in range(0, len(sequence), block_length):
-        # Partitioning of the block starting at position p.
-        block = [(max(start, p), min(stop, p + block_length), levels)
-                 for start, stop, levels in partitioning
-                 if start < p + block_length and stop > p]
-
-        result += ' '
-        for start, stop, levels in block:
-            delimiters = [(left, right) for level, (left, right)
-                          in enumerate(format.annotations) if level in levels]
-            result += (''.join(left for left, right in reversed(delimiters)) +
-                       str(sequence[start:stop]) +
-                       ''.join(right for left, right in delimiters))
-
-        if (not (p + block_length) % (block_length * blocks_per_line) and
-            p + block_length < len(sequence)):
-            result += ('\n' + (format.margin[0] +
-                               str(p + block_length + 1)).rjust(margin) +
-                       format.margin[1] + ' ')
-
-    return result
+                 + 1) + len(renderer.format.margin[0])
+
+    return renderer, region_start, region_stop, partitioning, margin
+
+
+def _chunk_tasks(sequence, partitioning, start, stop, margin, block_length,
+                 blocks_per_line, renderer, chunk_lines):
+    """
+    Split pretty-printing the region from `start` to `stop` of `sequence` in
+    chunks of `chunk_lines` lines, and yield the arguments for
+    :func:`_pprint_lines` for each chunk.
+
+    Each chunk is pretty-printed as a region of a window on the sequence, so
+    the arguments can be sent to a worker process. Chunks are aligned to
+    lines, so their output can simply be concatenated.
+    """
+    chunk_length = block_length * blocks_per_line * chunk_lines
+    for chunk_start, chunk_stop, chunk_partitioning in _split_partitioning(
+            partitioning, start, stop, chunk_length):
+        yield (_Window(sequence[chunk_start:chunk_stop], chunk_start,
+                       len(sequence)),
+               chunk_partitioning, chunk_start, chunk_stop, margin,
+               block_length, blocks_per_line, renderer)
+
+
+def _iter_lines(sequence, partitioning, start, stop, margin, block_length,
+                blocks_per_line, renderer, window_lines=100):
+    """
+    Iterator over the pretty-printed lines for the region from `start` to
+    `stop` of `sequence`, given its partitioning and the width of the margin.
+
+    The region is pretty-printed in windows of `window_lines` lines, and
+    only windows with visible annotations look at the partitioning for each
+    block.
+    """
+    # Without visible annotations, there is no need to look at the
+    # partitioning for each block.
+    if start == stop or not any(levels & renderer._supported
+                                for _, _, levels in partitioning):
+        return _iter_plain_lines(sequence, start, stop, margin, block_length,
+                                 blocks_per_line, renderer.format)
+    return _iter_windows(sequence, partitioning, start, stop, margin,
+                         block_length, blocks_per_line, renderer,
+                         window_lines)
+
+
+def _iter_windows(sequence, partitioning, start, stop, margin, block_length,
+                  blocks_per_line, renderer, window_lines):
+    """
+    Yield the pretty-printed lines for the region from `start` to `stop` of
+    `sequence` in windows of `window_lines` lines, see :func:`_iter_lines`.
+    """
+    window_length = block_length * blocks_per_line * window_lines
+    for window_start, window_stop, window_partitioning in _split_partitioning(
+            partitioning, start, stop, window_length):
+        if any(levels & renderer._supported
+               for _, _, levels in window_partitioning):
+            lines = _iter_annotated_lines(
+                sequence, window_partitioning, window_start, window_stop,
+                margin, block_length, blocks_per_line, renderer)
+        else:
+            lines = _iter_plain_lines(
+                sequence, window_start, window_stop, margin, block_length,
+                blocks_per_line, renderer.format)
+        for line in lines:
+            yield line
+
+
+def _iter_annotated_lines(sequence, partitioning, start, stop, margin,
+                          block_length, blocks_per_line, renderer):
+    """
+    Yield the pretty-printed lines for the region from `start` to `stop` of
+    `sequence`, see :func:`_iter_lines`.
+    """
+    format = renderer.format
+    line_length = block_length * blocks_per_line
+
+    # Slices that are strings are used as they are (on Python 2, they can
+    # also be unicode strings).
+    strings = isinstance(sequence[start:start + 1], _STRING_TYPES)
+
+    # Index of the first part in the partitioning overlapping the current
+    # block. Since both the blocks and the partitioning are sorted, this only
+    # ever moves forward.
+    i = 0
+
+    # An empty region still gets one line with only the margin.
+    for line_start in range(start, max(stop, start + 1), line_length):
+        line = [(format.margin[0] + str(line_start + 1)).rjust(margin) +
+                format.margin[1] + ' ']
+
+        for p in range(line_start, min(line_start + line_length, stop),
+                       block_length):
+            while partitioning[i][1] <= p:
+                i += 1
+
+            # Partitioning of the block starting at position p.
+            block = []
+            j = i
+            while (j < len(partitioning) and
+                   partitioning[j][0] < p + block_length):
+                part_start, part_stop, levels = partitioning[j]
+                block.append( (max(part_start, p),
+                               min(part_stop, p + block_length), levels) )
+                j += 1
+
+            line.append(' ')
+            for part_start, part_stop, levels in block:
+                left, right = renderer.delimiters(levels)
+                part = sequence[part_start:part_stop]
+                line.append(left + (part if strings else str(part)) + right)
+
+        yield ''.join(line)
+
+
+def _iter_plain_lines(sequence, start, stop, margin, block_length,
+                      blocks_per_line, format, chunk_lines=1000):
+    """
+    Yield the pretty-printed lines for the region from `start` to `stop` of
+    `sequence` without annotations, see :func:`_iter_lines`.
+
+    The sequence is sliced and split in blocks once for every `chunk_lines`
+    lines, each line is then a slice of the result.
+    """
+    left, right = format.margin
+    line_length = block_length * blocks_per_line
+
+    # Width of a line of blocks, including the space after it.
+    width = (block_length + 1) * blocks_per_line
+
+    if start == stop:
+        yield (left + str(start + 1)).rjust(margin) + right + ' '
+        return
+
+    for chunk_start in range(start, stop, line_length * chunk_lines):
+        chunk_stop = min(chunk_start + line_length * chunk_lines, stop)
+        chunk = sequence[chunk_start:chunk_stop]
+        if not isinstance(chunk, _STRING_TYPES):
+            chunk = str(chunk)
+        blocks = _spaced_blocks(chunk, block_length)
+        for i, position in zip(range(0, len(blocks), width),
+                               range(chunk_start + 1, chunk_stop + 1,
+                                     line_length)):
+            yield ((left + str(position)).rjust(margin) + right + '  ' +
+                   blocks[i:i + width - 1])
+
+
+def _spaced_blocks(data, block_length):
+    """
+    Split `data` in blocks of `block_length` separated by spaces. The result
+    has the same type as `data`.
+    """
+    try:
+        encoded = data.encode('ascii')
+    except UnicodeError:
+        return ' '.join([data[i:i + block_length]
+                         for i in range(0, len(data), block_length)])
+
+    # Instead of slicing each block, the data is copied to every position in
+    # the result that is not a separator, once for each position in a block.
+    blocks = -(-len(encoded) // block_length)
+    encoded += b' ' * (blocks * block_length - len(encoded))
+    spaced = bytearray(b' ') * (blocks * (block_length + 1))
+    for i in range(block_length):
+        spaced[i::block_length + 1] = encoded[i::block_length]
+    spaced = spaced[:len(data) + blocks - 1]
+    # On Python 2, `data` can be a native (byte) string.
+    if isinstance(data, bytes):
+        return bytes(spaced)
+    return spaced.decode('ascii')
+
+
+def _pprint_lines(*args):
+    """
+    Pretty-printed lines as a list, see :func:`_iter_lines`.
+    """
+    return list(_iter_lines(*args))
+
+
+def _split_partitioning(partitioning, start, stop, length):
+    """
+    Split the region from `start` to `stop` in chunks of `length` and yield
+    tuples (`chunk_start`, `chunk_stop`, `chunk_partitioning`) where
+    `chunk_partitioning` is the partitioning clipped to the chunk.
+    """
+    i = 0
+    for chunk_start in range(start, stop, length):
+        chunk_stop = min(chunk_start + length, stop)
+        while partitioning[i][1] <= chunk_start:
+            i += 1
+        chunk_partitioning = []
+        j = i
+        while j < len(partitioning) and partitioning[j][0] < chunk_stop:
+            part_start, part_stop, levels = partitioning[j]
+            chunk_partitioning.append( (max(part_start, chunk_start),
+                                        min(part_stop, chunk_stop), levels) )
+            j += 1
+        yield chunk_start, chunk_stop, chunk_partitioning
+
+
+class _Window(object):
+    """
+    Part of a sequence starting at `offset`, sliceable with positions in the
+    complete sequence of length `length`.
+    """
+    def __init__(self, data, offset, length):
+        self.data = data
+        self.offset = offset
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, key):
+        return self.data[key.start - self.offset:key.stop - self.offset]
+
+
+def pprint_sequences(sequences, annotations=None, block_length=10,
+                     blocks_per_line=6, format=PlaintextFormat, workers=1,
+                     chunk_size=64, chunk_length=None):
+    """
+    Pretty-print many sequences for use with a monospace font, optionally in
+    parallel.
+
+        >>> for pprinted in pprint_sequences(sequences, workers=4):
+        ...     print pprinted
+
+    :arg sequences: Sequences to pretty-print.
+    :type sequences: iterable
+    :arg annotations: For each sequence, its annotations (see
+        :func:`pprint_sequence`).
+    :type annotations: iterable
+    :arg workers: Number of worker processes to use. With 1 worker, all
+        sequences are pretty-printed in the current process. If `None`, the
+        number of CPUs is used.
+    :type workers: int
+    :arg chunk_size: Number of sequences to send to a worker process at once.
+    :type chunk_size: int
+    :arg chunk_length: If given, sequences are sent to a worker process in
+        chunks of at most this total length (but at least one sequence)
+        instead of `chunk_size` sequences.
+    :type chunk_length: int
+
+    :return: Iterator over pretty-printed versions of `sequences`, in order.
+    :rtype: iterator(str)
+
+    Sequences are read from `sequences` as they are needed, so only a few
+    chunks are in memory at any time. With more than 1 worker, sequences
+    and annotations must be picklable. For a description of the other
+    arguments, see :func:`pprint_sequence`.
+    """
+    if annotations is None:
+        annotations = itertools.repeat(None)
+    if workers is None:
+        workers = _cpu_count()
+    if not isinstance(format, Renderer):
+        format = Renderer(format)
+
+    items = zip(sequences, annotations)
+
+    if workers <= 1:
+        for sequence, sequence_annotations in items:
+            yield pprint_sequence(sequence, annotations=sequence_annotations,
+                                  block_length=block_length,
+                                  blocks_per_line=blocks_per_line,
+                                  format=format)
+        return
+
+    if chunk_length is None:
+        chunks = _chunks(items, chunk_size)
+    else:
+        chunks = _length_chunks(items, chunk_length)
+    tasks = ((chunk, block_length, blocks_per_line, format)
+             for chunk in chunks)
+
+    for pprinted_chunk in _parallel_map(_pprint_chunk, tasks, workers):
+        for pprinted in pprinted_chunk:
+            yield pprinted
+
+
+def _cpu_count():
+    """
+    Number of CPUs.
+    """
+    # Importing multiprocessing takes a significant part of the startup time
+    # of the command line interface, so we only do it when needed.
+    import multiprocessing
+
+    return multiprocessing.cpu_count()
+
+
+def _parallel_map(function, tasks, workers):
+    """
+    Yield the results of calling `function` with the arguments in `tasks`,
+    in order, using a pool of `workers` processes.
+
+    Tasks are submitted as results are consumed, keeping every worker busy
+    without reading all of `tasks` at once.
+    """
+    import multiprocessing
+
+    pool = multiprocessing.Pool(workers)
+    try:
+        pending = collections.deque()
+        for args in tasks:
+            pending.append(pool.apply_async(function, args))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _chunks(iterable, size):
+    """
+    Yield lists of `size` consecutive items from `iterable` (the last list
+    can be shorter).
+    """
+    iterator = iter(iterable)
+    return iter(lambda: list(itertools.islice(iterator, size)), [])
+
+
+def _length_chunks(items, length):
+    """
+    Yield lists of consecutive (`sequence`, `annotations`) tuples from
+    `items` with sequences of at most `length` in total (but at least one
+    tuple).
+    """
+    chunk = []
+    total = 0
+    for item in items:
+        if chunk and total + len(item[0]) > length:
+            yield chunk
+            chunk = []
+            total = 0
+        chunk.append(item)
+        total += len(item[0])
+    if chunk:
+        yield chunk
+
+
+def _pprint_chunk(chunk, block_length, blocks_per_line, format):
+    """
+    Pretty-print a list of (`sequence`, `annotations`) tuples.
+    """
+    return [pprint_sequence(sequence, annotations=annotations,
+                            block_length=block_length,
+                            blocks_per_line=blocks_per_line, format=format)
+            for sequence, annotations in chunk]
@@ -0,0 +1,305 @@
+"""
+Interactive terminal pager for pretty-printed sequences.
+
+Only the lines visible on the screen are pretty-printed, so scrolling and
+jumping to a position take the same time for sequences of any length. This
+requires sequences that can be sliced at any position, such as the records
+in a :class:`monoseq.fasta.FastaFile`.
+
+The interactive part of this module only works on Unix.
+
+.. moduleauthor:: Martijn Vermaat <martijn@vermaat.name>
+
+.. Licensed under the MIT license, see the LICENSE.rst file.
+"""
+
+
+import os
+
+from .monoseq import AnsiFormat, iter_pprint_sequence, Renderer
+
+
+#: Help shown in the status line.
+HELP = 'q:quit space/b:page j/k:line g/G:start/end n/p:record :go to'
+
+# Actions for keys and escape sequences read from the terminal.
+_KEYS = {b'q': 'quit', b'Q': 'quit', b'\x03': 'quit',
+         b' ': 'page_down', b'f': 'page_down', b'\x06': 'page_down',
+         b'\x1b[6~': 'page_down',
+         b'b': 'page_up', b'\x02': 'page_up', b'\x1b[5~': 'page_up',
+         b'j': 'line_down', b'\r': 'line_down', b'\n': 'line_down',
+         b'\x1b[B': 'line_down', b'\x1bOB': 'line_down',
+         b'k': 'line_up', b'\x1b[A': 'line_up', b'\x1bOA': 'line_up',
+         b'g': 'start', b'<': 'start', b'\x1b[H': 'start',
+         b'\x1b[1~': 'start', b'\x1bOH': 'start',
+         b'G': 'end', b'>': 'end', b'\x1b[F': 'end', b'\x1b[4~': 'end',
+         b'\x1bOF': 'end',
+         b'n': 'next_record', b'p': 'previous_record',
+         b':': 'prompt', b'/': 'prompt'}
+
+
+class Pager(object):
+    """
+    View on pretty-printed sequences of which only the visible lines are
+    pretty-printed.
+
+        >>> with FastaFile('genome.fa') as fasta:
+        ...     pager = Pager([(record.name, record) for record in fasta])
+        ...     pager.goto('chr7:127471196')
+        ...     print('\\n'.join(pager.render(20)))
+
+    :arg records: Sequences as (`name`, `sequence`) tuples, where each
+        `sequence` can be sliced at any position.
+    :type records: list(tuple)
+    :arg annotations: Annotation levels used for all sequences, as for
+        :func:`monoseq.pprint_sequence`.
+    :type annotations: list
+    :arg beds: Each BED index is an annotation level (after those in
+        `annotations`), with regions matched by sequence name.
+    :type beds: list(:class:`monoseq.bed.BedIndex`)
+    :arg format: Output format to use for pretty-printing.
+    :type format: :class:`monoseq.Format`
+
+    For a description of the other arguments, see
+    :func:`monoseq.pprint_sequence`. The current position is the first
+    visible line (:attr:`line`) of the current sequence (:attr:`record`).
+    """
+    def __init__(self, records, annotations=None, beds=None, block_length=10,
+                 blocks_per_line=6, format=AnsiFormat):
+        self.records = records
+        self.annotations = annotations or []
+        self.beds = beds or []
+        self.block_length = block_length
+        self.blocks_per_line = blocks_per_line
+        self.renderer = Renderer(format)
+        self.line_length = block_length * blocks_per_line
+        #: Index of the current sequence in `records`.
+        self.record = 0
+        #: Index of the first visible line of the current sequence.
+        self.line = 0
+
+    @property
+    def name(self):
+        """
+        Name of the current sequence.
+        """
+        return self.records[self.record][0]
+
+    @property
+    def sequence(self):
+        """
+        Current sequence.
+        """
+        return self.records[self.record][1]
+
+    def line_count(self):
+        """
+        Number of lines in the current sequence (at least one).
+        """
+        return max(-(-len(self.sequence) // self.line_length), 1)
+
+    def positions(self, count):
+        """
+        First and last position (one-based) of the sequence in `count` lines
+        from the current line.
+
+        :rtype: tuple(int, int)
+        """
+        start = self.line * self.line_length
+        return (min(start + 1, len(self.sequence)),
+                min(start + count * self.line_length, len(self.sequence)))
+
+    def render(self, count):
+        """
+        Pretty-print `count` lines from the current line (or fewer at the end
+        of the sequence).
+
+        :rtype: list(str)
+
+        Annotation regions from the BED indexes are only looked up for the
+        visible part of the sequence.
+        """
+        start = self.line * self.line_length
+        stop = min(start + count * self.line_length, len(self.sequence))
+        annotations = self.annotations + [
+            bed.overlapping(self.name, start, stop) for bed in self.beds]
+        return list(iter_pprint_sequence(
+            self.sequence, annotations=annotations,
+            block_length=self.block_length,
+            blocks_per_line=self.blocks_per_line, format=self.renderer,
+            start=start, stop=stop))
+
+    def scroll(self, lines, count=1):
+        """
+        Move the current line by `lines` (can be negative), keeping at least
+        `count` lines visible at the end of the sequence if possible.
+        """
+        line = self.line + lines
+        if lines > 0:
+            line = min(line, max(self.line_count() - count, self.line))
+        self.line = max(line, 0)
+
+    def switch(self, records):
+        """
+        Move to the start of the sequence `records` from the current one (can
+        be negative). Stops at the first and last sequence.
+        """
+        self.record = min(max(self.record + records, 0),
+                          len(self.records) - 1)
+        self.line = 0
+
+    def goto(self, location):
+        """
+        Move to `location`, given as POSITION (one-based, in the current
+        sequence), NAME, or NAME:POSITION.
+
+        A :exc:`ValueError` is raised if the location is invalid.
+        """
+        names = [name for name, _ in self.records]
+        location = location.strip()
+        if location in names:
+            name, position = location, ''
+        else:
+            name, _, position = location.replace(',', '').rpartition(':')
+            if not name and not position.isdigit():
+                name, position = position, ''
+
+        record = self.record
+        if name:
+            if name not in names:
+                raise ValueError('no sequence named %s' % name)
+            record = names.index(name)
+
+        line = 0
+        if position:
+            try:
+                position = int(position)
+            except ValueError:
+                raise ValueError('invalid position: %s' % position)
+            if not 1 <= position <= max(len(self.records[record][1]), 1):
+                raise ValueError('position out of range: %i' % position)
+            line = (position - 1) // self.line_length
+
+        self.record = record
+        self.line = line
+
+
+def page(pager, tty='/dev/tty'):
+    """
+    Show `pager` (a :class:`Pager`) interactively on the terminal `tty` until
+    the user quits.
+    """
+    import termios
+    import tty as tty_mode
+
+    fd = os.open(tty, os.O_RDWR)
+    attributes = termios.tcgetattr(fd)
+    try:
+        tty_mode.setcbreak(fd)
+        # Use the alternate screen, hide the cursor, and do not wrap lines.
+        _write(fd, '\x1b[?1049h\x1b[?25l\x1b[?7l')
+        message = None
+        while True:
+            columns, rows = _terminal_size(fd)
+            count = max(rows - 1, 1)
+            _draw(fd, pager, count, columns, message)
+            message = None
+
+            keys = os.read(fd, 16)
+            action = _KEYS.get(keys, _KEYS.get(keys[:1]))
+            if not keys or action == 'quit':
+                break
+            elif action == 'page_down':
+                pager.scroll(count, count)
+            elif action == 'page_up':
+                pager.scroll(-count, count)
+            elif action == 'line_down':
+                pager.scroll(1, count)
+            elif action == 'line_up':
+                pager.scroll(-1, count)
+            elif action == 'start':
+                pager.line = 0
+            elif action == 'end':
+                pager.line = max(pager.line_count() - count, 0)
+            elif action == 'next_record':
+                pager.switch(1)
+            elif action == 'previous_record':
+                pager.switch(-1)
+            elif action == 'prompt':
+                location = _prompt(fd, rows, 'Go to (POSITION, NAME, or '
+                                   'NAME:POSITION): ')
+                if location:
+                    try:
+                        pager.goto(location)
+                    except ValueError as e:
+                        message = str(e)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        _write(fd, '\x1b[?7h\x1b[?25h\x1b[?1049l')
+        termios.tcsetattr(fd, termios.TCSADRAIN, attributes)
+        os.close(fd)
+
+
+def _draw(fd, pager, count, columns, message=None):
+    """
+    Draw `count` lines from `pager` and a status line.
+    """
+    lines = pager.render(count)
+    lines += [''] * (count - len(lines))
+
+    if message is None:
+        first, last = pager.positions(count)
+        message = '%s%i-%i of %i  %s' % (pager.name and pager.name + ':',
+                                         first, last, len(pager.sequence),
+                                         HELP)
+
+    # Go to the top left and clear each line after writing it. Line feeds
+    # are translated to carriage return plus line feed by the terminal.
+    _write(fd, '\x1b[H' + ''.join(line + '\x1b[0m\x1b[K\n'
+                                  for line in lines) +
+           '\x1b[7m' + message[:columns - 1] + '\x1b[0m\x1b[K')
+
+
+def _prompt(fd, rows, text):
+    """
+    Read a line of input on the status line. Returns `None` if cancelled
+    with escape.
+    """
+    answer = ''
+    while True:
+        _write(fd, '\x1b[%i;1H\x1b[K\x1b[?25h%s%s' % (rows, text, answer))
+        keys = os.read(fd, 16)
+        if not keys or keys.startswith(b'\x1b'):
+            answer = None
+            break
+        # Pasted text can be read at once.
+        for key in keys.decode('utf-8', 'ignore'):
+            if key in '\r\n':
+                break
+            elif key in '\x7f\x08':
+                answer = answer[:-1]
+            elif key >= ' ':
+                answer += key
+        else:
+            continue
+        break
+    _write(fd, '\x1b[?25l')
+    return answer
+
+
+def _terminal_size(fd):
+    """
+    Number of columns and rows of the terminal.
+    """
+    try:
+        size = os.get_terminal_size(fd)
+    except (AttributeError, OSError):
+        return 80, 24
+    return size.columns or 80, size.lines or 24
+
+
+def _write(fd, text):
+    data = text.encode('utf-8')
+    while data:
+        data = data[os.write(fd, data):]
@@ -0,0 +1,314 @@
+"""
+Serving pretty-printing requests from a long-running ``monoseq`` process.
+
+Requests and responses are JSON objects, one per line. Starting ``monoseq``
+and indexing FASTA and BED files is done once instead of for every
+sequence, so this is much faster than running the command line interface
+for many small requests.
+
+.. moduleauthor:: Martijn Vermaat <martijn@vermaat.name>
+
+.. Licensed under the MIT license, see the LICENSE.rst file.
+"""
+
+
+import argparse
+import collections
+import json
+import os
+import socket
+import stat
+
+from .bed import BedIndex, read_bed
+from .commands import _region, _region_range
+from .compression import decompressed
+from .fasta import FastaFile
+from .monoseq import (AnsiFormat, HtmlFormat, iter_pprint_sequence,
+                      PlaintextFormat, Renderer)
+
+
+#: Output formats by name, as used in requests.
+FORMATS = {'plaintext': PlaintextFormat,
+           'ansi': AnsiFormat,
+           'html': HtmlFormat}
+
+# Types of strings decoded from JSON, on Python 2 these are unicode strings.
+_STRING_TYPES = str, type(u'')
+
+
+class Server(object):
+    """
+    Pretty-printer for a stream of requests.
+
+        >>> server = Server()
+        >>> server.handle({'sequence': 'TTACAGGCTACATTGCATGA',
+        ...                'annotations': [[[4, 8]]],
+        ...                'format': 'plaintext', 'block_length': 5})
+        ' 1  TTACA GGCTA CATTG CATGA'
+
+    :arg cache_size: Maximum number of FASTA files and BED files to keep
+        open.
+    :type cache_size: int
+    :arg stats: If given, the stages of pretty-printing are timed and
+        processed items are counted in this object for all requests.
+    :type stats: :class:`monoseq.stats.Stats`
+
+    A request is a dictionary with the following fields, all of them optional
+    except for either `sequence` or `fasta`:
+
+    `sequence`
+        Sequence to pretty-print.
+    `fasta`
+        Path to a FASTA file (uncompressed or compressed with ``bgzip``). Each
+        record is pretty-printed after a line with its name.
+    `region`
+        With `fasta`, only pretty-print this region, given as CHROM,
+        CHROM:START, or CHROM:START-END (positions are one-based and
+        inclusive). The region is printed on the line before it.
+    `annotations`
+        Annotation levels, each a list of (`start`, `stop`) pairs, as for
+        :func:`monoseq.pprint_sequence`.
+    `bed`
+        Path to a BED file (can be compressed). Regions on the chromosome of
+        the FASTA record are added as an annotation level. With `sequence`,
+        the first chromosome in the file is used.
+    `format`
+        Name of the output format, one of ``plaintext``, ``ansi`` (the
+        default), and ``html``.
+    `block_length`, `blocks_per_line`
+        As for :func:`monoseq.pprint_sequence`.
+
+    FASTA indexes, BED files, and the delimiters for each format are kept
+    between requests. Files are indexed again if they are modified.
+    """
+    def __init__(self, cache_size=16, stats=None):
+        self.cache_size = cache_size
+        self.stats = stats
+        self._fasta_files = collections.OrderedDict()
+        self._beds = collections.OrderedDict()
+        self._renderers = dict((name, Renderer(format))
+                               for name, format in FORMATS.items())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def handle(self, request):
+        """
+        Pretty-print a request.
+
+        :arg request: Request as described above.
+        :type request: dict
+
+        :return: Pretty-printed output.
+        :rtype: str
+
+        A :exc:`ValueError` is raised for invalid requests.
+        """
+        if not isinstance(request, dict):
+            raise ValueError('request must be an object')
+        unknown = set(request) - set(['id', 'sequence', 'fasta', 'region',
+                                      'annotations', 'bed', 'format',
+                                      'block_length', 'blocks_per_line'])
+        if unknown:
+            raise ValueError('unknown field(s) in request: %s'
+                             % ', '.join(sorted(unknown)))
+        if ('sequence' in request) == ('fasta' in request):
+            raise ValueError('request must have either sequence or fasta')
+        if not isinstance(request.get('sequence', ''), _STRING_TYPES):
+            raise ValueError('sequence must be a string')
+
+        try:
+            renderer = self._renderers[request.get('format', 'ansi')]
+        except (KeyError, TypeError):
+            raise ValueError('unknown format: %s' % request.get('format'))
+
+        options = {'block_length': request.get('block_length', 10),
+                   'blocks_per_line': request.get('blocks_per_line', 6),
+                   'format': renderer,
+                   'stats': self.stats}
+        for name in 'block_length', 'blocks_per_line':
+            if not isinstance(options[name], int) or options[name] < 1:
+                raise ValueError('%s must be a positive integer' % name)
+
+        levels = request.get('annotations') or []
+        if (not isinstance(levels, list) or
+            not all(isinstance(level, list) for level in levels)):
+            raise ValueError('annotations must be lists of (start, stop) '
+                             'pairs')
+        annotations = []
+        for level in levels:
+            try:
+                annotations.append([(int(start), int(stop))
+                                    for start, stop in level])
+            except (OverflowError, TypeError, ValueError):
+                raise ValueError('annotations must be lists of (start, stop) '
+                                 'pairs')
+        bed = self._bed(request['bed']) if 'bed' in request else None
+
+        if 'sequence' in request:
+            if bed is not None and bed.chroms():
+                annotations.append(bed.overlapping(bed.chroms()[0]))
+            return '\n'.join(iter_pprint_sequence(
+                request['sequence'], annotations=annotations, **options))
+
+        fasta = self._fasta_file(request['fasta'])
+
+        if 'region' not in request:
+            lines = []
+            for record in fasta:
+                record_annotations = list(annotations)
+                if bed is not None:
+                    record_annotations.append(bed.overlapping(record.name))
+                lines.append(record.name)
+                lines.extend(iter_pprint_sequence(
+                    record, annotations=record_annotations, **options))
+            return '\n'.join(lines)
+
+        if not isinstance(request['region'], _STRING_TYPES):
+            raise ValueError('region must be a string')
+        try:
+            region = _region(request['region'])
+        except argparse.ArgumentTypeError as e:
+            raise ValueError(str(e))
+        chrom = region[0]
+        if chrom not in fasta:
+            raise ValueError('no record in FASTA file: %s' % chrom)
+        sequence = fasta[chrom]
+        start, stop = _region_range(region, len(sequence))
+        if bed is not None:
+            annotations.append(bed.overlapping(chrom, start, stop))
+
+        lines = ['%s:%i-%i' % (chrom, start + 1, stop)]
+        lines.extend(iter_pprint_sequence(sequence, annotations=annotations,
+                                          start=start, stop=stop, **options))
+        return '\n'.join(lines)
+
+    def respond(self, line):
+        """
+        Handle a request given as a line of JSON.
+
+        :return: Response as a line of JSON (without line ending), with the
+            `id` of the request (if any) and either `output` with the
+            pretty-printed output or `error` with an error message.
+        :rtype: str
+
+        Any error in handling the request is reported in the response, so
+        one bad request cannot stop a long-running server.
+        """
+        response = collections.OrderedDict()
+        try:
+            request = json.loads(line)
+            if isinstance(request, dict) and 'id' in request:
+                response['id'] = request['id']
+            response['output'] = self.handle(request)
+        except Exception as e:
+            response['error'] = str(e) or e.__class__.__name__
+        return json.dumps(response)
+
+    def serve(self, input, output):
+        """
+        Read requests from `input` and write responses to `output`, both open
+        files in binary mode, until the end of `input`.
+
+        Each response is flushed before the next request is read. Empty
+        lines are ignored.
+        """
+        for line in iter(input.readline, b''):
+            line = line.strip()
+            if not line:
+                continue
+            output.write(self.respond(line.decode('utf-8')).encode('utf-8') +
+                         b'\n')
+            output.flush()
+
+    def serve_socket(self, path):
+        """
+        Listen on a Unix socket at `path` and serve requests from each
+        connection (see :meth:`serve`) until interrupted.
+
+        Connections are handled one at a time. The socket is removed when
+        done. A :exc:`socket.error` is raised if `path` already exists, in
+        which case it is left alone.
+        """
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        bound = False
+        try:
+            listener.bind(path)
+            bound = True
+            listener.listen(5)
+            while True:
+                connection, _ = listener.accept()
+                try:
+                    input = connection.makefile('rb')
+                    output = connection.makefile('wb')
+                    try:
+                        self.serve(input, output)
+                    finally:
+                        input.close()
+                        output.close()
+                except socket.error:
+                    # The client went away, wait for the next one.
+                    pass
+                finally:
+                    connection.close()
+        finally:
+            listener.close()
+            # Only remove the socket we created, never another file that
+            # took its place.
+            if (bound and os.path.exists(path) and
+                    stat.S_ISSOCK(os.stat(path).st_mode)):
+                os.remove(path)
+
+    def close(self):
+        """
+        Close all open FASTA files.
+        """
+        for _, fasta in self._fasta_files.values():
+            fasta.close()
+        self._fasta_files.clear()
+        self._beds.clear()
+
+    def _fasta_file(self, path):
+        """
+        Open FASTA file at `path`, reusing it if it was not modified.
+        """
+        return self._cached(self._fasta_files, path, FastaFile,
+                            lambda fasta: fasta.close())
+
+    def _bed(self, path):
+        """
+        Index of the BED file at `path`, reusing it if it was not modified.
+        """
+        def read(path):
+            with open(path, 'rb') as bed:
+                return BedIndex(read_bed(decompressed(bed)))
+        return self._cached(self._beds, path, read)
+
+    def _cached(self, cache, path, open_file, close_file=None):
+        """
+        Get the object for `path` from `cache`, calling `open_file` if it is
+        not there or the file was modified. Least recently used objects are
+        removed with `close_file` (if given) when the cache is full.
+        """
+        if not isinstance(path, _STRING_TYPES):
+            raise ValueError('path must be a string')
+        status = os.stat(path)
+        signature = status.st_mtime, status.st_size
+
+        entry = cache.pop(path, None)
+        if entry is not None and entry[0] != signature:
+            if close_file:
+                close_file(entry[1])
+            entry = None
+        if entry is None:
+            entry = signature, open_file(path)
+        cache[path] = entry
+
+        while len(cache) > self.cache_size:
+            _, (_, value) = cache.popitem(last=False)
+            if close_file:
+                close_file(value)
+        return entry[1]
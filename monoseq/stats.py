@@ -0,0 +1,152 @@
+"""
+Timings and counts for profiling ``monoseq``.
+
+.. moduleauthor:: Martijn Vermaat <martijn@vermaat.name>
+
+.. Licensed under the MIT license, see the LICENSE.rst file.
+"""
+
+
+import collections
+import contextlib
+import sys
+import time
+
+
+# Most accurate clock for measuring wall time.
+_clock = getattr(time, 'perf_counter', time.time)
+
+
+class Stats(object):
+    """
+    Wall time per stage and counts of processed items, collected while
+    pretty-printing.
+
+        >>> stats = Stats()
+        >>> pprinted = pprint_sequence(sequence, annotations, stats=stats)
+        >>> print(stats.report())
+        stage                 time (s)
+        partition                0.004
+        render                   0.118
+        total                    0.122
+        ...
+
+    Stages can be nested, in which case the time spent in the inner stage is
+    not counted for the outer stage. Stages used by ``monoseq`` are
+    ``partition``, ``render``, and ``read cache``, and in the command line
+    interface also ``read BED``, ``index FASTA``, ``read FASTA``, ``read
+    FASTQ``, ``annotate qualities``, and ``write``. Counts are
+    kept for ``records``, ``regions``, ``partitions``, ``lines``, and
+    ``bytes``.
+
+    To handle timings and counts as they are collected (e.g., to log them),
+    override :meth:`add_time` and :meth:`add_count`.
+
+    Collecting statistics is opt-in: functions accepting a :class:`Stats`
+    object do no extra work if it is `None`.
+    """
+    def __init__(self):
+        #: Seconds spent per stage.
+        self.times = collections.OrderedDict()
+        #: Counts per item.
+        self.counts = collections.OrderedDict()
+        self._created = self._last = _clock()
+        self._stages = []
+
+    def add_time(self, stage, seconds):
+        """
+        Add `seconds` to the time spent in `stage`.
+        """
+        self.times[stage] = self.times.get(stage, 0.0) + seconds
+
+    def add_count(self, item, count=1):
+        """
+        Add `count` to the count for `item`.
+        """
+        self.counts[item] = self.counts.get(item, 0) + count
+
+    def start(self, stage):
+        """
+        Start timing `stage`, pausing the current stage (if any).
+        """
+        self._switch()
+        self._stages.append(stage)
+
+    def stop(self):
+        """
+        Stop timing the current stage, resuming the stage before it (if any).
+        """
+        self._switch()
+        self._stages.pop()
+
+    def _switch(self):
+        now = _clock()
+        if self._stages:
+            self.add_time(self._stages[-1], now - self._last)
+        self._last = now
+
+    @contextlib.contextmanager
+    def stage(self, stage):
+        """
+        Context manager timing `stage`.
+        """
+        self.start(stage)
+        try:
+            yield
+        finally:
+            self.stop()
+
+    def timed(self, iterable, stage, item=None):
+        """
+        Iterate over `iterable`, timing getting each item as `stage` and
+        counting the items as `item` (if given).
+        """
+        iterator = iter(iterable)
+        while True:
+            self.start(stage)
+            try:
+                value = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.stop()
+            if item is not None:
+                self.add_count(item)
+            yield value
+
+    def total_time(self):
+        """
+        Seconds since this object was created.
+        """
+        return _clock() - self._created
+
+    def peak_memory(self):
+        """
+        Peak resident set size of this process in megabytes, or `None` if
+        this is not available on this platform.
+        """
+        try:
+            import resource
+        except ImportError:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, OS X reports bytes.
+        return peak / (1024.0 ** 2 if sys.platform == 'darwin' else 1024.0)
+
+    def report(self):
+        """
+        Report of all timings and counts, and peak memory use.
+
+        :rtype: str
+        """
+        lines = ['{:<20} {:>10}'.format('stage', 'time (s)')]
+        for stage, seconds in self.times.items():
+            lines.append('{:<20} {:10.3f}'.format(stage, seconds))
+        lines.append('{:<20} {:10.3f}'.format('total', self.total_time()))
+        lines.append('')
+        for item, count in self.counts.items():
+            lines.append('{:<20} {:>10}'.format(item, count))
+        peak = self.peak_memory()
+        if peak is not None:
+            lines.append('{:<20} {:10.1f}'.format('peak memory (MB)', peak))
+        return '\n'.join(lines)
@@ -42,6 +42,9 @@ setup(
     platforms=['any'],
     packages=['monoseq'],
     install_requires=install_requires,
+    extras_require={
+        'numpy': ['numpy'],
+        },
     entry_points = {
         'console_scripts': ['monoseq = monoseq.commands:main']
         },
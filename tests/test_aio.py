@@ -0,0 +1,69 @@
+"""
+Tests for the aio module.
+"""
+
+
+import sys
+
+from nose.plugins.skip import SkipTest
+from nose.tools import *
+
+
+from monoseq.monoseq import HtmlFormat, pprint_sequence
+
+
+SEQUENCE = 'MIMANQPLWLDSEVEMNHYQQSHIKSKSPYFPEDKHICWIKIFKAFGT' * 20
+
+
+def _chunks(async_iterator):
+    """
+    Run the event loop to get all chunks from `async_iterator`.
+    """
+    import asyncio
+
+    loop = asyncio.new_event_loop()
+    chunks = []
+    try:
+        while True:
+            try:
+                chunks.append(loop.run_until_complete(
+                    async_iterator.__anext__()))
+            except StopAsyncIteration:
+                return chunks
+    finally:
+        loop.close()
+
+
+class TestAio(object):
+    """
+    Tests for the aio module.
+    """
+    def setup(self):
+        if sys.version_info < (3, 6):
+            raise SkipTest
+
+    def test_apprint_sequence(self):
+        """
+        Pretty-print in chunks.
+        """
+        from monoseq.aio import apprint_sequence
+
+        annotations = [[(5, 25), (70, 300)], [(20, 90)]]
+        chunks = _chunks(apprint_sequence(SEQUENCE, annotations=annotations,
+                                          format=HtmlFormat, chunk_lines=3))
+        assert_equal(len(chunks), 6)
+        assert_equal(''.join(chunks),
+                     pprint_sequence(SEQUENCE, annotations=annotations,
+                                     format=HtmlFormat))
+
+    def test_apprint_sequence_region(self):
+        """
+        Pretty-print a region in chunks.
+        """
+        from monoseq.aio import apprint_sequence
+
+        for start, stop in ((100, 700), (10, 10)):
+            chunks = _chunks(apprint_sequence(SEQUENCE, start=start,
+                                              stop=stop, chunk_lines=2))
+            assert_equal(''.join(chunks),
+                         pprint_sequence(SEQUENCE, start=start, stop=stop))
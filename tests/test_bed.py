@@ -0,0 +1,52 @@
+"""
+Tests for the bed module.
+"""
+
+
+from nose.tools import *
+
+
+from monoseq.bed import BedIndex, read_bed
+
+
+class TestBed(object):
+    """
+    Tests for the bed module.
+    """
+    def test_read_bed(self):
+        """
+        Read regions from a BED file with header lines.
+        """
+        bed = ('browser position chr7:127471196-127495720\n',
+               'track name="ItemRGBDemo" description="Item RGB demonstration" visibility=2 itemRgb="On"\n',
+               '# A comment\n',
+               'chr7	127471196	127472363	Pos1	0	+	127471196	127472363	255,0,0\n',
+               'chr8	127475864	127477031	Neg1	0	-	127475864	127477031	0,0,255\n',
+               '\n')
+        assert_equal(list(read_bed(bed)),
+                     [('chr7', 127471196, 127472363),
+                      ('chr8', 127475864, 127477031)])
+        assert_equal(list(read_bed(line.encode('utf-8') for line in bed)),
+                     [('chr7', 127471196, 127472363),
+                      ('chr8', 127475864, 127477031)])
+
+    def test_bed_index(self):
+        """
+        Query an index of unsorted regions.
+        """
+        index = BedIndex([('chr2', 50, 60),
+                          ('chr1', 30, 40),
+                          ('chr2', 0, 100),
+                          ('chr1', 10, 20),
+                          ('chr2', 10, 20),
+                          ('chr1', 35, 38)])
+        assert_equal(index.chroms(), ['chr2', 'chr1'])
+        assert_equal(len(index), 6)
+        assert_equal(index.overlapping('chr1'),
+                     [(10, 20), (30, 40), (35, 38)])
+        assert_equal(index.overlapping('chr1', 20, 36),
+                     [(30, 40), (35, 38)])
+        assert_equal(index.overlapping('chr1', 38, 100), [(30, 40)])
+        assert_equal(index.overlapping('chr2', 30, 40), [(0, 100)])
+        assert_equal(index.overlapping('chr2', stop=11), [(0, 100), (10, 20)])
+        assert_equal(index.overlapping('chr3'), [])
@@ -0,0 +1,126 @@
+"""
+Tests for the cache module.
+"""
+
+
+import os
+import shutil
+import tempfile
+
+from nose.tools import *
+
+
+from monoseq.cache import Cache
+from monoseq.monoseq import (AnsiFormat, iter_pprint_sequence,
+                             PlaintextFormat, pprint_sequence)
+
+
+SEQUENCE = 'MIMANQPLWLDSEVEMNHYQQSHIKSKSPYFPEDKHICWIKIFKAFGT' * 4
+
+
+class TestCache(object):
+    """
+    Tests for the cache module.
+    """
+    def setup(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = Cache(os.path.join(self.directory, 'cache'))
+
+    def teardown(self):
+        shutil.rmtree(self.directory)
+
+    def test_pprint_sequence(self):
+        """
+        Pretty-print a sequence twice, the second time from the cache.
+        """
+        annotations = [[(5, 25), (70, 100)], [(20, 90)]]
+        expected = pprint_sequence(SEQUENCE, annotations=annotations,
+                                   format=AnsiFormat, start=7)
+        assert_equal(pprint_sequence(SEQUENCE, annotations=annotations,
+                                     format=AnsiFormat, start=7,
+                                     cache=self.cache),
+                     expected)
+
+        key = self.cache.key(SEQUENCE, annotations=annotations,
+                             format=AnsiFormat, start=7)
+        path = os.path.join(self.cache.entries_directory, key)
+        with open(path, 'w') as entry:
+            entry.write('cached\nlines\n')
+        assert_equal(pprint_sequence(SEQUENCE, annotations=annotations,
+                                     format=AnsiFormat, start=7,
+                                     cache=self.cache),
+                     'cached\nlines')
+
+    def test_key(self):
+        """
+        Keys only depend on what affects the output.
+        """
+        key = self.cache.key(SEQUENCE, annotations=[[(5, 25)], [(8, 9)]],
+                             format=AnsiFormat, start=10, stop=100)
+        assert_equal(self.cache.key(SEQUENCE,
+                                    annotations=[[(0, 25), (120, 130)],
+                                                 [(8, 9)]],
+                                    format=AnsiFormat, start=10, stop=100),
+                     key)
+        assert_equal(self.cache.key(SEQUENCE, annotations=[[(5, 25)]],
+                                    format=PlaintextFormat),
+                     self.cache.key(SEQUENCE, format=PlaintextFormat))
+        assert key != self.cache.key(SEQUENCE,
+                                     annotations=[[(5, 25)], [(8, 9)]],
+                                     format=AnsiFormat, start=10, stop=100,
+                                     block_length=5)
+        assert key != self.cache.key(SEQUENCE.lower(),
+                                     annotations=[[(5, 25)], [(8, 9)]],
+                                     format=AnsiFormat, start=10, stop=100)
+
+    def test_partially_consumed(self):
+        """
+        Lines are not stored if they are not all consumed.
+        """
+        lines = iter_pprint_sequence(SEQUENCE, cache=self.cache)
+        next(lines)
+        lines.close()
+        assert_equal(os.listdir(self.cache.entries_directory), [])
+
+    def test_evict(self):
+        """
+        Remove least recently used entries.
+        """
+        for i, key in enumerate(['a', 'b', 'c']):
+            list(self.cache.store(key, ['x' * 99]))
+            path = os.path.join(self.cache.entries_directory, key)
+            os.utime(path, (1000 + i, 1000 + i))
+        list(self.cache.lines('a'))
+
+        self.cache.max_size = 250
+        self.cache.evict()
+        assert_equal(sorted(os.listdir(self.cache.entries_directory)),
+                     ['a', 'c'])
+
+    def test_store_evict(self):
+        """
+        Remove least recently used entries when storing exceeds the maximum
+        size.
+        """
+        self.cache.max_size = 250
+        for i, key in enumerate(['a', 'b', 'c', 'd']):
+            list(self.cache.store(key, ['x' * 99]))
+            path = os.path.join(self.cache.entries_directory, key)
+            os.utime(path, (1000 + i, 1000 + i))
+        assert_equal(sorted(os.listdir(self.cache.entries_directory)),
+                     ['c', 'd'])
+
+    def test_evict_other_files(self):
+        """
+        Files in the cache directory that are not cache entries are not
+        removed.
+        """
+        path = os.path.join(self.cache.directory, 'notes.txt')
+        with open(path, 'w') as notes:
+            notes.write('x' * 1000)
+        list(self.cache.store('a', ['x' * 99]))
+
+        self.cache.max_size = 0
+        self.cache.evict()
+        assert os.path.exists(path)
+        assert_equal(os.listdir(self.cache.entries_directory), [])
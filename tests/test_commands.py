@@ -3,62 +3,106 @@ Tests for the commands module.
 """
 
 
+import io
+import tempfile
+
 from nose.tools import *
 
 
-from monoseq.commands import _bed_iter, _fasta_iter
+from monoseq.commands import (_fasta_stream_iter, _region, _region_range,
+                              _sorted_bed_levels, pprint)
 
 
 class TestCommands(object):
     """
     Tests for the commands module.
     """
-    def test_fasta_iter(self):
+    def test_fasta_stream_iter(self):
         """
-        Iterate over a multi-record FASTA file.
+        Lazily iterate over a multi-record FASTA file.
         """
-        fasta = ('>sequence 1\n',
-                 'TTACAGGCTACATTGCATGATCATTGCATGATTTACAGGCTACATTGCATGAT\n',
-                 'TGCATGATTTACAGGCTACATTGCATGATCATTGCATGATTTACAGGCTACAT\n',
-                 'GGCTACATTGCATGATCATTG\n',
-                 '>sequence 2\n',
-                 'GGCTACATTTACAGGCTACATTGCATGATCATTGCATGAGGCTACATTTACAG\n',
-                 'AGGCTACATTGCATGATCATTGCA\n')
-        result = list(_fasta_iter(fasta))
-        expected = [('sequence 1',
-                     'TTACAGGCTACATTGCATGATCATTGCATGATTTACAGGCTACATTGCATGAT'
-                     'TGCATGATTTACAGGCTACATTGCATGATCATTGCATGATTTACAGGCTACAT'
-                     'GGCTACATTGCATGATCATTG'),
-                    ('sequence 2',
-                     'GGCTACATTTACAGGCTACATTGCATGATCATTGCATGAGGCTACATTTACAG'
-                     'AGGCTACATTGCATGATCATTGCA')]
+        fasta = tempfile.TemporaryFile()
+        fasta.write(b'>sequence 1\n'
+                    b'TTACAGGCTACATTGCATGATCATTGCATGATTTACAGGCTACATTGCATGAT\n'
+                    b'TGCATGATTTACAGGCTACATTGCATGATCATTGCATGATTTACAGGCTACAT\n'
+                    b'GGCTACATTGCATGATCATTG\n'
+                    b'>sequence 2\n'
+                    b'>sequence 3\n'
+                    b'AGGCTACATTGCATGATCATTGCA\n')
+        fasta.seek(0)
+        result = [(header, len(sequence), sequence[0:20], sequence[50:70],
+                   sequence[120:130])
+                  for header, sequence in _fasta_stream_iter(fasta)]
+        expected = [('sequence 1', 127, 'TTACAGGCTACATTGCATGA',
+                     'GATTGCATGATTTACAGGCT', 'ATCATTG'),
+                    ('sequence 2', 0, '', '', ''),
+                    ('sequence 3', 24, 'AGGCTACATTGCATGATCAT', '', '')]
         assert_equal(result, expected)
 
-    def test_chrom_iter(self):
+    def test_pprint_fastq(self):
+        """
+        Pretty-print a FASTQ file with quality thresholds.
+        """
+        fastq = io.BytesIO(b'@read1 description\n'
+                           b'ACGTACGTAC\n'
+                           b'+\n'
+                           b'II#I+5IIII\n'
+                           b'@read2\n'
+                           b'GGCC\n'
+                           b'+\n'
+                           b'##II\n')
+        output = io.BytesIO()
+        pprint(fastq, quality_thresholds=[5, 20], block_length=5,
+               output_file=output)
+        assert_equal(output.getvalue().decode('utf-8').split('\n'),
+                     ['read1 description',
+                      ' 1  AC\033[1m\033[91mG\033[0m\033[0mT'
+                      '\033[1mA\033[0m CGTAC',
+                      'read2',
+                      '1  \033[1m\033[91mGG\033[0m\033[0mCC',
+                      ''])
+
+    def test_region(self):
+        """
+        Parse region strings.
+        """
+        assert_equal(_region('chr7'), ('chr7', None, None))
+        assert_equal(_region('chr7:1001'), ('chr7', 1000, None))
+        assert_equal(_region('chr7:1,001-2,000'), ('chr7', 1000, 2000))
+
+    def test_region_range(self):
         """
-        Iterate over a multi-chromosome BED file.
+        Regions in a record.
         """
-        bed = ('browser position chr7:127471196-127495720\n',
-               'browser hide all\n',
-               'track name="ItemRGBDemo" description="Item RGB demonstration" visibility=2 itemRgb="On"\n',
-               'chr7	127471196	127472363	Pos1	0	+	127471196	127472363	255,0,0\n',
-               'chr7	127472363	127473530	Pos2	0	+	127472363	127473530	255,0,0\n',
-               'chr7	127473530	127474697	Pos3	0	+	127473530	127474697	255,0,0\n',
-               'chr7	127474697	127475864	Pos4	0	+	127474697	127475864	255,0,0\n',
-               'chr8	127475864	127477031	Neg1	0	-	127475864	127477031	0,0,255\n',
-               'chr8	127477031	127478198	Neg2	0	-	127477031	127478198	0,0,255\n',
-               'chr2	127478198	127479365	Neg3	0	-	127478198	127479365	0,0,255\n',
-               'chr2	127479365	127480532	Pos5	0	+	127479365	127480532	255,0,0\n',
-               'chr2	127480532	127481699	Neg4	0	-	127480532	127481699	0,0,255\n')
-        result = [(chrom, list(chrom_iter))
-                  for chrom, chrom_iter in _bed_iter(bed)]
-        expected = [('chr7', [(127471196, 127472363),
-                              (127472363, 127473530),
-                              (127473530, 127474697),
-                              (127474697, 127475864)]),
-                    ('chr8', [(127475864, 127477031),
-                              (127477031, 127478198)]),
-                    ('chr2', [(127478198, 127479365),
-                              (127479365, 127480532),
-                              (127480532, 127481699)])]
+        assert_equal(_region_range(('chr7', None, None), 100), (0, 100))
+        assert_equal(_region_range(('chr7', 49, 200), 100), (49, 100))
+        assert_equal(_region_range(('chr7', None, None), 0), (0, 0))
+        assert_raises(ValueError, _region_range, ('chr7', 100, None), 100)
+
+    def test_sorted_bed_levels(self):
+        """
+        Merge sorted BED files alongside chromosomes.
+        """
+        beds = [('chr1\t5\t10\n',
+                 'chrUn\t0\t10\n',
+                 'chr3\t4\t8\n',
+                 'chr3\t1\t2\n'),
+                ('track name=test\n',
+                 'chr2\t0\t3\n',
+                 'chr3\t6\t9\n')]
+        result = list(_sorted_bed_levels(beds, ['chr1', 'chr2', 'chr3',
+                                                'chr4']))
+        expected = [[[(5, 10)], []],
+                    [[], [(0, 3)]],
+                    [[(4, 8), (1, 2)], [(6, 9)]],
+                    [[], []]]
         assert_equal(result, expected)
+
+    def test_sorted_bed_levels_unsorted(self):
+        """
+        Merge unsorted BED files alongside chromosomes.
+        """
+        beds = [('chr2\t0\t3\n',
+                 'chr1\t5\t10\n')]
+        assert_raises(ValueError, list,
+                      _sorted_bed_levels(beds, ['chr1', 'chr2']))
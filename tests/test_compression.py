@@ -0,0 +1,131 @@
+"""
+Tests for the compression module.
+"""
+
+
+import bz2
+import gzip
+import io
+import os
+import shutil
+import struct
+import tempfile
+import zlib
+
+from nose.tools import *
+
+
+from monoseq.compression import (BGZF, BgzfFile, build_gzi, BZIP2,
+                                 compression, decompressed, GZIP, read_gzi)
+from monoseq.fasta import FastaFile
+
+
+FASTA = (b'>sequence 1 description\n'
+         b'TTACAGGCTACATTGCATGA\n'
+         b'TGCATGATTTACAGGCTACA\n'
+         b'GGCTACATTG\n'
+         b'>sequence2\n'
+         b'GGCTACATTTACAGG\n'
+         b'AGGCTACATTGCATG\n')
+
+
+def bgzip(data, block_length):
+    """
+    Compress `data` in BGZF format with `block_length` bytes per block.
+    """
+    blocks = []
+    for i in range(0, len(data), block_length) or [0]:
+        block = data[i:i + block_length]
+        compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+        deflated = compressor.compress(block) + compressor.flush()
+        blocks.append(b'\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00'
+                      b'BC\x02\x00' +
+                      struct.pack('<H', len(deflated) + 25) + deflated +
+                      struct.pack('<II', zlib.crc32(block) & 0xffffffff,
+                                  len(block)))
+    return b''.join(blocks)
+
+
+def gzip_compress(data):
+    """
+    Compress `data` in gzip format (:func:`gzip.compress` is not available
+    on Python 2).
+    """
+    output = io.BytesIO()
+    with gzip.GzipFile(fileobj=output, mode='wb') as gzip_file:
+        gzip_file.write(data)
+    return output.getvalue()
+
+
+class TestCompression(object):
+    """
+    Tests for the compression module.
+    """
+    def setup(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'test.fa.gz')
+        with open(self.path, 'wb') as bgzf_file:
+            bgzf_file.write(bgzip(FASTA, 16))
+
+    def teardown(self):
+        shutil.rmtree(self.directory)
+
+    def test_compression(self):
+        """
+        Detect compression formats.
+        """
+        assert_equal(compression(io.BytesIO(FASTA)), None)
+        assert_equal(compression(io.BytesIO(gzip_compress(FASTA))), GZIP)
+        assert_equal(compression(io.BytesIO(bgzip(FASTA, 16))), BGZF)
+        assert_equal(compression(io.BytesIO(bz2.compress(FASTA))), BZIP2)
+
+    def test_decompressed(self):
+        """
+        Read decompressed data.
+        """
+        for data in (FASTA, gzip_compress(FASTA), bgzip(FASTA, 16),
+                     bz2.compress(FASTA)):
+            assert_equal(decompressed(io.BytesIO(data)).read(), FASTA)
+
+    def test_build_gzi(self):
+        """
+        Build the block index for a BGZF file.
+        """
+        with open(self.path, 'rb') as bgzf_file:
+            blocks = build_gzi(bgzf_file)
+        assert_equal([offset for _, offset in blocks],
+                     list(range(0, len(FASTA), 16)))
+
+    def test_read_gzi(self):
+        """
+        Read the block index for a BGZF file.
+        """
+        index = io.BytesIO(struct.pack('<5Q', 2, 40, 16, 80, 32))
+        assert_equal(read_gzi(index), [(0, 0), (40, 16), (80, 32)])
+
+    def test_bgzf_file(self):
+        """
+        Slice a BGZF file.
+        """
+        with BgzfFile(self.path, cache_size=2) as data:
+            for start, stop in ((0, 5), (10, 40), (3, 100), (90, 200),
+                                (120, 130), (15, 17)):
+                assert_equal(data[start:stop], FASTA[start:stop])
+
+    def test_fasta_file_bgzf(self):
+        """
+        Slice records in a BGZF compressed FASTA file.
+        """
+        with FastaFile(self.path) as fasta:
+            assert_equal(fasta['sequence'][15:45],
+                         'CATGATGCATGATTTACAGGCTACAGGCTA')
+            assert_equal(fasta['sequence2'][:],
+                         'GGCTACATTTACAGGAGGCTACATTGCATG')
+
+    def test_fasta_file_gzip(self):
+        """
+        Random access to a gzip compressed FASTA file is not possible.
+        """
+        with open(self.path, 'wb') as gzip_file:
+            gzip_file.write(gzip_compress(FASTA))
+        assert_raises(ValueError, FastaFile, self.path)
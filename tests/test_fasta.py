@@ -0,0 +1,79 @@
+"""
+Tests for the fasta module.
+"""
+
+
+import os
+import shutil
+import tempfile
+
+from nose.tools import *
+
+
+from monoseq.fasta import build_index, FastaFile, IndexEntry
+
+
+FASTA = ('>sequence 1 description\n'
+         'TTACAGGCTACATTGCATGA\n'
+         'TGCATGATTTACAGGCTACA\n'
+         'GGCTACATTG\n'
+         '>sequence2\n'
+         'GGCTACATTTACAGG\n'
+         'AGGCTACATTGCATG\n')
+
+
+class TestFasta(object):
+    """
+    Tests for the fasta module.
+    """
+    def setup(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'test.fa')
+        with open(self.path, 'w') as fasta:
+            fasta.write(FASTA)
+
+    def teardown(self):
+        shutil.rmtree(self.directory)
+
+    def test_build_index(self):
+        """
+        Build the index for a FASTA file.
+        """
+        with open(self.path, 'rb') as fasta:
+            assert_equal(build_index(fasta),
+                         [IndexEntry('sequence', 50, 24, 20, 21),
+                          IndexEntry('sequence2', 30, 88, 15, 16)])
+
+    def test_build_index_line_lengths(self):
+        """
+        Build the index for a FASTA file with different line lengths.
+        """
+        with open(self.path, 'w') as fasta:
+            fasta.write('>sequence\nTTACAGGCTA\nCATT\nGCATGATTTA\n')
+        with open(self.path, 'rb') as fasta:
+            assert_raises(ValueError, build_index, fasta)
+
+    def test_fasta_file(self):
+        """
+        Slice records in a FASTA file.
+        """
+        with FastaFile(self.path) as fasta:
+            assert_equal([record.name for record in fasta],
+                         ['sequence', 'sequence2'])
+            record = fasta['sequence']
+            assert_equal(len(record), 50)
+            assert_equal(record[15:45], 'CATGATGCATGATTTACAGGCTACAGGCTA')
+            assert_equal(record[-3:], 'TTG')
+            assert_equal(record[20], 'T')
+            assert_equal(str(fasta['sequence2']),
+                         'GGCTACATTTACAGGAGGCTACATTGCATG')
+
+    def test_fasta_file_index(self):
+        """
+        Slice records in a FASTA file using an existing index.
+        """
+        with open(self.path + '.fai', 'w') as index:
+            index.write('sequence2\t30\t88\t15\t16\n')
+        with FastaFile(self.path) as fasta:
+            assert_equal(len(fasta), 1)
+            assert_equal(fasta['sequence2'][10:20], 'ACAGGAGGCT')
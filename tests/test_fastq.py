@@ -0,0 +1,74 @@
+"""
+Tests for the fastq module.
+"""
+
+
+import io
+
+from nose.tools import *
+from nose.plugins.skip import SkipTest
+
+
+from monoseq.fastq import (_low_quality_runs_numpy, _low_quality_runs_scan,
+                           quality_levels, read_fastq)
+from monoseq.monoseq import _numpy
+
+
+class TestFastq(object):
+    """
+    Tests for the fastq module.
+    """
+    def test_read_fastq(self):
+        """
+        Read a FASTQ file.
+        """
+        fastq = io.BytesIO(b'@read1 description\n'
+                           b'ACGTACGTAC\n'
+                           b'+\n'
+                           b'II#I+5IIII\n'
+                           b'@read2\n'
+                           b'GGCC\n'
+                           b'+read2\n'
+                           b'@@II\n')
+        assert_equal(list(read_fastq(fastq)),
+                     [('read1 description', 'ACGTACGTAC', b'II#I+5IIII'),
+                      ('read2', 'GGCC', b'@@II')])
+
+    def test_read_fastq_invalid(self):
+        """
+        Read invalid FASTQ files.
+        """
+        for fastq in (b'>read1\nACGT\n+\nIIII\n',
+                      b'@read1\nACGT\n+\n',
+                      b'@read1\nACGT\n-\nIIII\n',
+                      b'@read1\nACGT\n+\nIII\n'):
+            assert_raises(ValueError, list, read_fastq(io.BytesIO(fastq)))
+
+    def test_quality_levels(self):
+        """
+        Annotation levels for quality thresholds.
+        """
+        levels = quality_levels([b'II#I+5IIII', b'##II', b''], [5, 20])
+        assert_equal([[list(regions) for regions in read_levels]
+                      for read_levels in levels],
+                     [[[(2, 3)], [(2, 3), (4, 5)]],
+                      [[(0, 2)], [(0, 2)]],
+                      [[], []]])
+        assert_equal(quality_levels([b'II#I', b'##'], []), [[], []])
+
+    def test_low_quality_runs_numpy(self):
+        """
+        Runs of low quality scores with NumPy.
+        """
+        numpy = _numpy()
+        if numpy is None:
+            raise SkipTest('NumPy is not installed')
+        data = b'\xff'.join([b'#II##I', b'', b'I', b'#I#I####'])
+        read_starts = [0, 7, 8, 10]
+        for minimum in (35, 60, 80):
+            assert_equal([list(regions) for regions in
+                          _low_quality_runs_numpy(numpy, data, read_starts,
+                                                  minimum)],
+                         [list(regions) for regions in
+                          _low_quality_runs_scan(data, read_starts,
+                                                 minimum)])
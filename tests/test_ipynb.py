@@ -0,0 +1,119 @@
+"""
+Tests for the monoseq.ipynb module.
+"""
+
+
+from nose.tools import *
+
+
+from monoseq import ipynb
+from monoseq.monoseq import HtmlFormat, pprint_sequence
+
+
+SEQUENCE = 'MIMANQPLWLDSEVEMNHYQQSHIKSKSPYFPEDKHICWIKIFKAFGT' * 10
+
+
+def _pre(html):
+    """
+    Contents of the ``<pre>`` element in `html`.
+    """
+    return html.split('">', 1)[1][:-len('</pre>')]
+
+
+class _MutableSequence(object):
+    """
+    Sequence that can be modified in place.
+    """
+    def __init__(self, letters):
+        self.letters = list(letters)
+
+    def __len__(self):
+        return len(self.letters)
+
+    def __getitem__(self, key):
+        return ''.join(self.letters[key])
+
+
+class TestIpynb(object):
+    """
+    Tests for the monoseq.ipynb module.
+    """
+    def test_seq(self):
+        """
+        Simple Seq with annotations.
+        """
+        annotations = [[(5, 25), (70, 300)], [(20, 90)]]
+        html = ipynb.Seq(SEQUENCE, annotations=annotations)._repr_html_()
+        assert html.startswith('<style>')
+        assert_equal(_pre(html),
+                     pprint_sequence(SEQUENCE, annotations=annotations,
+                                     format=HtmlFormat))
+
+    def test_seq_update_annotations(self):
+        """
+        Seq with changed annotations.
+        """
+        seq = ipynb.Seq(SEQUENCE, annotations=[[(5, 25)], [(20, 90)]])
+        seq._repr_html_()
+        for annotations in ([[(5, 25)], [(20, 90), (400, 410)]],
+                            [[(5, 25)]],
+                            [[(5, 25)], [], [(100, 250), (420, 480)]],
+                            None):
+            seq.annotations = annotations
+            assert_equal(_pre(seq._repr_html_()),
+                         pprint_sequence(SEQUENCE, annotations=annotations,
+                                         format=HtmlFormat))
+
+    def test_seq_cached(self):
+        """
+        New Seq objects for the same sequence reuse its rendering.
+        """
+        first = ipynb.Seq(SEQUENCE, annotations=[[(5, 25)]])._repr_html_()
+        second = ipynb.Seq(SEQUENCE, annotations=[[(6, 25)]])._repr_html_()
+        assert_equal(first.split('<pre')[0], second.split('<pre')[0])
+        assert_equal(_pre(second),
+                     pprint_sequence(SEQUENCE, annotations=[[(6, 25)]],
+                                     format=HtmlFormat))
+
+    def test_seq_mutable(self):
+        """
+        Renderings of mutable sequences are not reused.
+        """
+        sequence = _MutableSequence('ACGT' * 20)
+        seq = ipynb.Seq(sequence, annotations=[[(5, 25)]])
+        seq._repr_html_()
+        sequence.letters[30:34] = 'TTTT'
+        assert_equal(_pre(seq._repr_html_()),
+                     pprint_sequence(str(sequence[:]),
+                                     annotations=[[(5, 25)]],
+                                     format=HtmlFormat))
+
+    def test_seq_cache_size(self):
+        """
+        The cache holds at most CACHE_SIZE renderings.
+        """
+        sequences = [SEQUENCE[:i] for i in range(1, ipynb.CACHE_SIZE + 10)]
+        for sequence in sequences:
+            ipynb.Seq(sequence)._repr_html_()
+        assert_equal(len(ipynb._cache), ipynb.CACHE_SIZE)
+
+    def test_seq_pages(self):
+        """
+        Seq displayed one page at a time.
+        """
+        lines = pprint_sequence(SEQUENCE, annotations=[[(5, 250)]],
+                                format=HtmlFormat).split('\n')
+        seq = ipynb.Seq(SEQUENCE, annotations=[[(5, 250)]], page_lines=3)
+        assert_equal(seq.page_count, 3)
+        for page in (0, 2, 1):
+            html = seq.goto(page)._repr_html_()
+            assert_equal(html.split('">', 1)[1].split('</pre>')[0],
+                         '\n'.join(lines[page * 3:page * 3 + 3]))
+        assert html.endswith('<p>Page 2 of 3 (positions 181 to 360 of '
+                             '480).</p>')
+
+    def test_seq_goto_out_of_range(self):
+        """
+        Going to a page that does not exist.
+        """
+        assert_raises(IndexError, ipynb.Seq(SEQUENCE, page_lines=3).goto, 3)
@@ -3,11 +3,17 @@ Tests for the monoseq module.
 """
 
 
+from nose.plugins.skip import SkipTest
 from nose.tools import *
 
 
-from monoseq.monoseq import (HtmlFormat, AnsiFormat, PlaintextFormat,
-                             partition_range, pprint_sequence)
+from monoseq.monoseq import (_iter_annotated_lines, _numpy,
+                             _partition_range_numpy, _partition_range_sweep,
+                             _prepare, Format, HtmlFormat,
+                             AnsiFormat, PlaintextFormat,
+                             iter_pprint_sequence, partition_range,
+                             pprint_sequence, pprint_sequences, Regions,
+                             Renderer)
 
 
 class TestMonoseq(object):
@@ -29,6 +35,57 @@ class TestMonoseq(object):
                       (40, 46, {1}),
                       (46, 50, set())])
 
+    def test_partition_range_unsorted_overlapping(self):
+        """
+        Partition of range with unsorted and overlapping regions.
+        """
+        assert_equal(partition_range(30, annotations=[[(20, 25), (2, 8),
+                                                       (5, 12), (10, 11)],
+                                                      [(6, 40), (0, 3)]]),
+                     [(0, 2, {1}),
+                      (2, 3, {0, 1}),
+                      (3, 6, {0}),
+                      (6, 12, {0, 1}),
+                      (12, 20, {1}),
+                      (20, 25, {0, 1}),
+                      (25, 30, {1})])
+
+    def test_partition_range_regions_bitmask(self):
+        """
+        Partition of range with compact regions and levels as bitmasks.
+        """
+        assert_equal(partition_range(50, annotations=[Regions([0, 30], [21, 35]),
+                                                      Regions([15, 40], [32, 46])],
+                                     bitmask=True),
+                     [(0, 15, 1),
+                      (15, 21, 3),
+                      (21, 30, 2),
+                      (30, 32, 3),
+                      (32, 35, 1),
+                      (35, 40, 0),
+                      (40, 46, 2),
+                      (46, 50, 0)])
+
+    def test_partition_range_numpy(self):
+        """
+        Partition of range with NumPy.
+        """
+        numpy = _numpy()
+        if numpy is None:
+            raise SkipTest('NumPy is not installed')
+        annotations = [[(20, 25), (-2, 8), (5, 12), (10, 11), (12, 12)],
+                       Regions([6, 0, 40], [40, 3, 45]),
+                       []]
+        assert_equal(_partition_range_numpy(numpy, 42, annotations),
+                     _partition_range_sweep(42, annotations))
+
+    def test_regions_from_mask(self):
+        """
+        Create regions from a mask.
+        """
+        mask = [False, True, True, False, False, True, False, True]
+        assert_equal(list(Regions.from_mask(mask)), [(1, 3), (5, 6), (7, 8)])
+
     def test_pprint_sequence(self):
         """
         Pretty-print a simple sequence in plaintext.
@@ -40,6 +97,98 @@ class TestMonoseq(object):
                      '121  KSKSPYFPED KHICWIKIFK AFGTMIMANQ PLWLDSEVEM NHYQQSHIKS KSPYFPEDKH\n'
                      '181  ICWIKIFKAF GT')
 
+    def test_iter_pprint_sequence(self):
+        """
+        Pretty-print a simple sequence in plaintext line by line.
+        """
+        sequence = 'MIMANQPLWLDSEVEMNHYQQSHIKSKSPYFPEDKHICWIKIFKAFGT' * 4
+        assert_equal(list(iter_pprint_sequence(sequence, blocks_per_line=4)),
+                     ['  1  MIMANQPLWL DSEVEMNHYQ QSHIKSKSPY FPEDKHICWI',
+                      ' 41  KIFKAFGTMI MANQPLWLDS EVEMNHYQQS HIKSKSPYFP',
+                      ' 81  EDKHICWIKI FKAFGTMIMA NQPLWLDSEV EMNHYQQSHI',
+                      '121  KSKSPYFPED KHICWIKIFK AFGTMIMANQ PLWLDSEVEM',
+                      '161  NHYQQSHIKS KSPYFPEDKH ICWIKIFKAF GT'])
+
+    def test_pprint_sequence_sparse(self):
+        """
+        Pretty-print a long sequence with few annotations.
+        """
+        sequence = 'MIMANQPLWLDSEVEMNHYQQSHIKSKSPYFPEDKHICWIKIFKAFGT' * 500
+        annotations = [[(100, 110), (15000, 15010)], [(6000, 6001)]]
+        renderer, start, stop, partitioning, margin = _prepare(
+            sequence, annotations, AnsiFormat, None, None)
+        expected = '\n'.join(_iter_annotated_lines(
+            sequence, partitioning, start, stop, margin, 10, 6, renderer))
+        assert_equal(pprint_sequence(sequence, annotations=annotations,
+                                     format=AnsiFormat),
+                     expected)
+
+    def test_pprint_sequence_unannotated(self):
+        """
+        Pretty-print sequences without visible annotations.
+        """
+        sequence = 'MIMANQPLWLDSEVEMNHYQQSHIKSKSPYFPEDKHICWIKIFKAFGT' * 4
+        format = Format([], ('<', '>'))
+        assert_equal(pprint_sequence(sequence, annotations=[[(3, 50)]],
+                                     block_length=7, blocks_per_line=5,
+                                     format=format, start=150),
+                     '<151>  PLWLDSE VEMNHYQ QSHIKSK SPYFPED KHICWIK\n'
+                     '<186>  IFKAFGT')
+        assert_equal(pprint_sequence(u'\u03b1\u03b2\u03b3' * 5,
+                                     block_length=4, blocks_per_line=2),
+                     u' 1  \u03b1\u03b2\u03b3\u03b1 \u03b2\u03b3\u03b1\u03b2\n'
+                     u' 9  \u03b3\u03b1\u03b2\u03b3 \u03b1\u03b2\u03b3')
+
+    def test_pprint_sequence_type(self):
+        """
+        Pretty-printed sequences have the type of the sequence, with and
+        without annotations.
+        """
+        for sequence in ('ACGT' * 30, u'ACGT' * 30):
+            assert_equal(type(pprint_sequence(sequence)), type(sequence))
+            assert_equal(type(pprint_sequence(sequence,
+                                              annotations=[[(0, 5)]],
+                                              format=AnsiFormat)),
+                         type(sequence))
+
+    def test_pprint_sequence_region(self):
+        """
+        Pretty-print a region of a sequence in plaintext.
+        """
+        sequence = 'MIMANQPLWLDSEVEMNHYQQSHIKSKSPYFPEDKHICWIKIFKAFGT' * 4
+        assert_equal(pprint_sequence(sequence, start=55, stop=130),
+                     ' 56  LWLDSEVEMN HYQQSHIKSK SPYFPEDKHI CWIKIFKAFG TMIMANQPLW LDSEVEMNHY\n'
+                     '116  QQSHIKSKSP YFPED')
+
+    def test_pprint_sequence_workers(self):
+        """
+        Pretty-print sequence to HTML in parallel chunks.
+        """
+        sequence = 'MIMANQPLWLDSEVEMNHYQQSHIKSKSPYFPEDKHICWIKIFKAFGT' * 40
+        annotations = [[(12, 230), (1000, 1800)],
+                       [(14, 15), (380, 390), (820, 1830)]]
+        assert_equal(pprint_sequence(sequence, annotations=annotations,
+                                     format=HtmlFormat, start=7, workers=2,
+                                     chunk_lines=3),
+                     pprint_sequence(sequence, annotations=annotations,
+                                     format=HtmlFormat, start=7))
+
+    def test_pprint_sequence_mask(self):
+        """
+        Pretty-print sequence with annotation given as a NumPy mask.
+        """
+        numpy = _numpy()
+        if numpy is None:
+            raise SkipTest('NumPy is not installed')
+        sequence = 'MIMANQPLWLDSEVEMNHYQQSHIKSKSPYFPEDKHICWIKIFKAFGT' * 4
+        mask = numpy.zeros(len(sequence), dtype=bool)
+        mask[12:23] = True
+        mask[80:100] = True
+        assert_equal(pprint_sequence(sequence, annotations=[mask],
+                                     format=AnsiFormat, start=5),
+                     pprint_sequence(sequence, annotations=[[(12, 23), (80, 100)]],
+                                     format=AnsiFormat, start=5))
+
     def test_pprint_sequence_html(self):
         """
         Pretty-print sequence to HTML with two annotation levels.
@@ -61,6 +210,33 @@ class TestMonoseq(object):
                      '<span class="monoseq-margin">121</span>  KSKSPYFPED KHICWIKIFK AFGTMIMANQ PLWLDSEVEM NHYQQSHIKS KSPYFPEDKH\n'
                      '<span class="monoseq-margin">181</span>  ICWIKIFKAF GT')
 
+    def test_pprint_sequence_renderer(self):
+        """
+        Pretty-print sequences to HTML with a reused renderer.
+        """
+        renderer = Renderer(HtmlFormat, cache_size=2)
+        sequence = 'MIMANQPLWLDSEVEMNHYQQSHIKSKSPYFPEDKHICWIKIFKAFGT' * 4
+        for annotations in ([[(12, 23)], [(14, 15), (38, 39), (82, 83)]],
+                            [[(0, 100), (150, 160)], [], [(20, 170)]]):
+            assert_equal(pprint_sequence(sequence, annotations=annotations,
+                                         format=renderer),
+                         pprint_sequence(sequence, annotations=annotations,
+                                         format=HtmlFormat))
+        assert_equal(renderer.delimiters(0b11),
+                     ('<span class="monoseq-annotation-1">'
+                      '<span class="monoseq-annotation-0">',
+                      '</span></span>'))
+
+    def test_renderer_cache(self):
+        """
+        A renderer keeps the delimiters for the most recently used
+        combinations of levels.
+        """
+        renderer = Renderer(HtmlFormat, cache_size=2)
+        for levels in (0b01, 0b10, 0b01, 0b11):
+            renderer.delimiters(levels)
+        assert_equal(list(renderer._cache), [0b01, 0b11])
+
     def test_pprint_sequence_ansi(self):
         """
         Pretty-print sequence to plaintext with ANSI escapes with two
@@ -82,3 +258,21 @@ class TestMonoseq(object):
                      'HICWIKI FKAFGTMIMA NQPLWLDSEV EMNHYQQSHI\n'
                      '121  KSKSPYFPED KHICWIKIFK AFGTMIMANQ PLWLDSEVEM NHYQQSHIKS KSPYFPEDKH\n'
                      '181  ICWIKIFKAF GT')
+
+    def test_pprint_sequences(self):
+        """
+        Pretty-print many sequences in parallel.
+        """
+        sequences = ['MIMANQPLWLDSEVEMNHYQQSHIKSKSPYFPEDKHICWIKIFKAFGT' * n
+                     for n in range(20)]
+        annotations = [[[(n, n + 30)], [(2 * n, 3 * n)]] for n in range(20)]
+        expected = [pprint_sequence(sequence, annotations=a, format=AnsiFormat)
+                    for sequence, a in zip(sequences, annotations)]
+        assert_equal(list(pprint_sequences(sequences, annotations=annotations,
+                                           format=AnsiFormat, workers=2,
+                                           chunk_size=3)),
+                     expected)
+        assert_equal(list(pprint_sequences(sequences, annotations=annotations,
+                                           format=AnsiFormat, workers=2,
+                                           chunk_length=500)),
+                     expected)
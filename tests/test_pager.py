@@ -0,0 +1,79 @@
+"""
+Tests for the pager module.
+"""
+
+
+from nose.tools import *
+
+
+from monoseq.bed import BedIndex
+from monoseq.pager import Pager
+
+
+RECORDS = [('sequence1', 'ACGTACGTAC' * 5),
+           ('sequence2', 'GGCCTTAAGG' * 2)]
+
+
+class TestPager(object):
+    """
+    Tests for the pager module.
+    """
+    def setup(self):
+        self.pager = Pager(RECORDS, block_length=5, blocks_per_line=2)
+
+    def test_render(self):
+        """
+        Pretty-print lines from the current line.
+        """
+        self.pager.line = 3
+        assert_equal(self.pager.render(5),
+                     ['31  ACGTA CGTAC', '41  ACGTA CGTAC'])
+        assert_equal(self.pager.positions(5), (31, 50))
+
+    def test_render_annotations(self):
+        """
+        Pretty-print lines with annotations and BED regions of the current
+        sequence.
+        """
+        pager = Pager(RECORDS, annotations=[[(3, 8)]],
+                      beds=[BedIndex([('sequence2', 12, 14)])],
+                      block_length=5, blocks_per_line=2)
+        pager.switch(1)
+        pager.line = 1
+        assert_equal(pager.render(1),
+                     ['11  GG\033[1mCC\033[0mT TAAGG'])
+        pager.switch(-1)
+        assert_equal(pager.render(1),
+                     [' 1  ACG\033[91mTA\033[0m \033[91mCGT\033[0mAC'])
+
+    def test_scroll(self):
+        """
+        Scroll without moving past the first and last lines.
+        """
+        self.pager.scroll(10, 2)
+        assert_equal(self.pager.line, 3)
+        self.pager.scroll(-1)
+        assert_equal(self.pager.line, 2)
+        self.pager.scroll(-10)
+        assert_equal(self.pager.line, 0)
+
+    def test_goto(self):
+        """
+        Go to a position, a sequence, or a position in a sequence.
+        """
+        self.pager.goto('23')
+        assert_equal((self.pager.record, self.pager.line), (0, 2))
+        self.pager.goto('sequence2:12')
+        assert_equal((self.pager.record, self.pager.line), (1, 1))
+        self.pager.goto('sequence1')
+        assert_equal((self.pager.record, self.pager.line), (0, 0))
+
+    def test_goto_invalid(self):
+        """
+        Going to an invalid location does not move.
+        """
+        self.pager.line = 2
+        assert_raises(ValueError, self.pager.goto, 'sequence3')
+        assert_raises(ValueError, self.pager.goto, 'sequence2:21')
+        assert_raises(ValueError, self.pager.goto, 'sequence2:x')
+        assert_equal((self.pager.record, self.pager.line), (0, 2))
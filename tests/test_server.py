@@ -0,0 +1,143 @@
+"""
+Tests for the server module.
+"""
+
+
+import io
+import json
+import os
+import shutil
+import socket
+import tempfile
+
+from nose.tools import *
+
+
+from monoseq.server import Server
+
+
+FASTA = ('>sequence1 description\n'
+         'TTACAGGCTACATTGCATGA\n'
+         'TGCATGATTT\n'
+         '>sequence2\n'
+         'GGCTACATTT\n')
+
+BED = ('sequence1\t2\t6\n'
+       'sequence2\t0\t3\n')
+
+
+class TestServer(object):
+    """
+    Tests for the server module.
+    """
+    def setup(self):
+        self.directory = tempfile.mkdtemp()
+        self.fasta_path = os.path.join(self.directory, 'test.fa')
+        with open(self.fasta_path, 'w') as fasta:
+            fasta.write(FASTA)
+        self.bed_path = os.path.join(self.directory, 'test.bed')
+        with open(self.bed_path, 'w') as bed:
+            bed.write(BED)
+        self.server = Server()
+
+    def teardown(self):
+        self.server.close()
+        shutil.rmtree(self.directory)
+
+    def test_sequence(self):
+        """
+        Pretty-print a sequence with annotations.
+        """
+        result = self.server.handle({'sequence': 'TTACAGGCTACATTGCATGA',
+                                     'annotations': [[(4, 8)]],
+                                     'format': 'ansi', 'block_length': 5})
+        assert_equal(result, ' 1  TTAC\033[91mA\033[0m \033[91mGGC\033[0mTA '
+                     'CATTG CATGA')
+
+    def test_fasta(self):
+        """
+        Pretty-print all records in a FASTA file with a BED file.
+        """
+        result = self.server.handle({'fasta': self.fasta_path,
+                                     'bed': self.bed_path,
+                                     'blocks_per_line': 2})
+        assert_equal(result.split('\n'),
+                     ['sequence1',
+                      ' 1  TT\033[91mACAG\033[0mGCTA CATTGCATGA',
+                      '21  TGCATGATTT',
+                      'sequence2',
+                      ' 1  \033[91mGGC\033[0mTACATTT'])
+
+    def test_region(self):
+        """
+        Pretty-print a region in a FASTA file.
+        """
+        result = self.server.handle({'fasta': self.fasta_path,
+                                     'region': 'sequence1:5-14',
+                                     'bed': self.bed_path,
+                                     'format': 'plaintext'})
+        assert_equal(result, 'sequence1:5-14\n 5  AGGCTACATT')
+        assert_raises(ValueError, self.server.handle,
+                      {'fasta': self.fasta_path, 'region': 'sequence1:31'})
+
+    def test_cached(self):
+        """
+        FASTA files are reused until they are modified.
+        """
+        request = {'fasta': self.fasta_path, 'format': 'plaintext'}
+        self.server.handle(request)
+        fasta = self.server._fasta_file(self.fasta_path)
+        self.server.handle(request)
+        assert self.server._fasta_file(self.fasta_path) is fasta
+
+        with open(self.fasta_path, 'a') as fasta_file:
+            fasta_file.write('>sequence3\nACGT\n')
+        assert_equal(self.server.handle(request).split('\n')[-2:],
+                     ['sequence3', '1  ACGT'])
+
+    def test_serve(self):
+        """
+        Serve requests with errors in some of them.
+        """
+        requests = [{'id': 1, 'sequence': 'ACGT', 'format': 'plaintext'},
+                    {'id': 2, 'fasta': self.fasta_path, 'region': 'chr9'},
+                    {'id': 3, 'sequence': 'ACGT', 'format': 'pdf'}]
+        input = io.BytesIO(b'\n'.join(json.dumps(request).encode('utf-8')
+                                      for request in requests) +
+                           b'\n\nnot json\n')
+        output = io.BytesIO()
+        self.server.serve(input, output)
+        responses = [json.loads(line) for line in
+                     output.getvalue().decode('utf-8').splitlines()]
+        assert_equal(responses,
+                     [{'id': 1, 'output': '1  ACGT'},
+                      {'id': 2, 'error': 'no record in FASTA file: chr9'},
+                      {'id': 3, 'error': 'unknown format: pdf'},
+                      {'error': responses[3].get('error')}])
+        assert 'error' in responses[3]
+
+    def test_invalid_annotations(self):
+        """
+        Invalid annotations are reported without stopping the server.
+        """
+        lines = [b'{"id": 1, "sequence": "ACGT", "annotations": 5}',
+                 b'{"id": 2, "sequence": "ACGT", '
+                 b'"annotations": [[[0, Infinity]]]}',
+                 b'{"id": 3, "sequence": "ACGT", "format": "plaintext"}']
+        output = io.BytesIO()
+        self.server.serve(io.BytesIO(b'\n'.join(lines) + b'\n'), output)
+        responses = [json.loads(line) for line in
+                     output.getvalue().decode('utf-8').splitlines()]
+        error = 'annotations must be lists of (start, stop) pairs'
+        assert_equal(responses,
+                     [{'id': 1, 'error': error},
+                      {'id': 2, 'error': error},
+                      {'id': 3, 'output': '1  ACGT'}])
+
+    def test_serve_socket_existing(self):
+        """
+        Serving on an existing path fails and leaves the file alone.
+        """
+        assert_raises(socket.error, self.server.serve_socket, self.bed_path)
+        with open(self.bed_path) as bed:
+            assert_equal(bed.read(), BED)
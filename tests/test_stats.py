@@ -0,0 +1,54 @@
+"""
+Tests for the stats module.
+"""
+
+
+from nose.tools import *
+
+
+from monoseq.monoseq import AnsiFormat, pprint_sequence
+from monoseq.stats import Stats
+
+
+class TestStats(object):
+    """
+    Tests for the stats module.
+    """
+    def test_stages(self):
+        """
+        Time nested stages.
+        """
+        stats = Stats()
+        with stats.stage('outer'):
+            with stats.stage('inner'):
+                pass
+            with stats.stage('inner'):
+                pass
+        assert_equal(list(stats.times), ['outer', 'inner'])
+        assert stats.total_time() >= sum(stats.times.values())
+
+    def test_timed(self):
+        """
+        Time and count items of an iterable.
+        """
+        stats = Stats()
+        assert_equal(list(stats.timed(range(5), 'stage', 'items')),
+                     list(range(5)))
+        assert_equal(list(stats.times), ['stage'])
+        assert_equal(stats.counts['items'], 5)
+
+    def test_pprint_sequence(self):
+        """
+        Collect statistics while pretty-printing.
+        """
+        stats = Stats()
+        sequence = 'MIMANQPLWLDSEVEMNHYQQSHIKSKSPYFPEDKHICWIKIFKAFGT' * 4
+        annotations = [[(5, 25), (70, 100)], [(20, 90)]]
+        assert_equal(pprint_sequence(sequence, annotations=annotations,
+                                     format=AnsiFormat, stats=stats),
+                     pprint_sequence(sequence, annotations=annotations,
+                                     format=AnsiFormat))
+        assert_equal(list(stats.times), ['partition', 'render'])
+        assert_equal(dict(stats.counts),
+                     {'regions': 3, 'partitions': 7, 'lines': 4})
+        assert 'partitions' in stats.report()